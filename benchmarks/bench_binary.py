@@ -0,0 +1,42 @@
+"""
+  Compare the binary encoding of a large literal job dump with its JSON.
+
+    python benchmarks/bench_binary.py [megabytes]
+"""
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_json import Job, Process, best_of, job_dump
+
+from pystachio import binary
+
+
+def main(megabytes, iterations=3):
+  dump = job_dump(megabytes, templates=False)
+  job = Job.json_loads(dump, trusted=True)
+  data = binary.encode(job)
+  print('JSON %.1fMB, binary %.1fMB' % (len(dump) / float(1 << 20), len(data) / float(1 << 20)))
+  for name, function, args in (
+      ('Job.json_dumps', Job.json_dumps, (job,)),
+      ('binary.encode', binary.encode, (job,)),
+      ('Job.json_loads trusted', Job.json_loads, (dump, False, True)),
+      ('binary.decode', binary.decode, (Job, data))):
+    print('%-24s %.2fs' % (name, best_of(iterations, function, *args)))
+
+  processes = job.processes().get()
+  records = [Process(process) for process in processes]
+  fp = io.BytesIO()
+  binary.dump(Process, records, fp)
+  print('%d Process records: JSON Lines %.1fMB, binary %.1fMB' % (
+      len(records), sum(len(record.json_dumps()) + 1 for record in records) / float(1 << 20),
+      len(fp.getvalue()) / float(1 << 20)))
+  print('%-24s %.2fs' % ('binary.iter_decode', best_of(
+      iterations, lambda: list(binary.iter_decode(Process, io.BytesIO(fp.getvalue()))))))
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,37 @@
+"""
+  Measure the wall-clock cost of importing pystachio in a fresh interpreter.
+
+    python benchmarks/bench_import.py [iterations]
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(statement, iterations):
+  env = dict(os.environ, PYTHONPATH=ROOT)
+  timings = []
+  for _ in range(iterations):
+    start = time.perf_counter()
+    subprocess.check_call([sys.executable, '-c', statement], env=env)
+    timings.append(time.perf_counter() - start)
+  return timings
+
+
+def main(iterations):
+  best_baseline = min(time_import('pass', iterations))
+  print('%-32s %.1fms' % ('interpreter startup', best_baseline * 1000))
+  for statement in ('import pystachio',
+                    'from pystachio import Ref',
+                    'from pystachio import *',
+                    'import pystachio.config'):
+    best = min(time_import(statement, iterations))
+    print('%-32s %.1fms (+%.1fms)' % (statement, best * 1000, (best - best_baseline) * 1000))
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,89 @@
+"""
+  Measure Struct.json_loads and Struct.json_dumps on a large job dump.
+
+    python benchmarks/bench_json.py [megabytes]
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pystachio import Default, Enum, Float, Integer, List, Map, String, Struct
+
+
+class Resources(Struct):
+  cpu = Float
+  ram = Integer
+  disk = Integer
+
+
+class Process(Struct):
+  name = String
+  cmdline = String
+  daemon = Default(String, 'false')
+  resources = Resources
+  env = Map(String, String)
+
+
+class Job(Struct):
+  name = String
+  role = String
+  tier = Enum('Tier', ('preemptible', 'production'))
+  processes = List(Process)
+
+
+def job_dump(megabytes, templates=True):
+  process = {
+    'name': 'process',
+    'cmdline': 'echo {{mesos.instance}} && ./run --port={{thermos.ports[http]}}',
+    'resources': {'cpu': 1.0, 'ram': 1 << 30, 'disk': 1 << 31},
+    'env': {'PATH': '/usr/bin:/bin', 'HOME': '/home/{{role}}'},
+  }
+  if not templates:
+    process.update(cmdline='echo 0 && ./run --port=8080', env={'HOME': '/home/www-data'})
+  size = len(json.dumps(process)) + 2
+  count = megabytes * (1 << 20) // size
+  return json.dumps({'name': 'job', 'role': 'www-data', 'tier': 'production',
+                     'processes': [dict(process, name='process%d' % k) for k in range(count)]})
+
+
+def legacy_json_loads(json_string, cls):
+  return cls(cls._filter_against_schema(json.loads(json_string)))
+
+
+def legacy_json_dumps(obj):
+  return json.dumps(obj.interpolate()[0].get())
+
+
+def best_of(iterations, function, *args, **kw):
+  timings = []
+  for _ in range(iterations):
+    start = time.perf_counter()
+    function(*args, **kw)
+    timings.append(time.perf_counter() - start)
+  return min(timings)
+
+
+def main(megabytes, iterations=3):
+  dump = job_dump(megabytes)
+  print('%.1fMB job dump' % (len(dump) / float(1 << 20)))
+  for name, function, kw in (
+      ('json.loads', json.loads, {}),
+      ('filter + __init__', legacy_json_loads, {'cls': Job}),
+      ('Job.json_loads', Job.json_loads, {}),
+      ('Job.json_loads trusted', Job.json_loads, {'trusted': True})):
+    print('%-24s %.2fs' % (name, best_of(iterations, function, dump, **kw)))
+
+  for templates, size in ((False, megabytes), (True, max(1, megabytes // 10))):
+    job = Job.json_loads(job_dump(size, templates), trusted=True)
+    print('%dMB job, %s' % (size, 'templated' if templates else 'literal'))
+    for name, function in (('interpolate + json.dumps', legacy_json_dumps),
+                           ('Job.json_dumps', Job.json_dumps)):
+      print('  %-24s %.2fs' % (name, best_of(iterations, function, job)))
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
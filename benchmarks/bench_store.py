@@ -0,0 +1,58 @@
+"""
+  Compare opening a ConfigStore and looking up fields with loading JSON Lines.
+
+    python benchmarks/bench_store.py [megabytes]
+"""
+
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_json import Job, Process, job_dump
+
+from pystachio.store import ConfigStore
+
+
+def main(megabytes, lookups=10000):
+  job = Job.json_loads(job_dump(megabytes, templates=False), trusted=True)
+  records = dict((process['name'], Process(process)) for process in job.processes().get())
+  jsonl = io.StringIO()
+  Process.dump_jsonl(records.values(), jsonl)
+  fd, filename = tempfile.mkstemp()
+  os.close(fd)
+  try:
+    ConfigStore.write(filename, Process, records)
+    print('%d records: JSON Lines %.1fMB, store %.1fMB' % (
+        len(records), len(jsonl.getvalue()) / float(1 << 20),
+        os.path.getsize(filename) / float(1 << 20)))
+
+    start = time.perf_counter()
+    jsonl.seek(0)
+    loaded = dict((process.name().get(), process) for process in Process.iter_jsonl(jsonl))
+    print('%-32s %.3fs' % ('load JSON Lines', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    store = ConfigStore(filename, Process)
+    print('%-32s %.6fs' % ('open store', time.perf_counter() - start))
+
+    keys = random.sample(sorted(records), min(lookups, len(records)))
+    start = time.perf_counter()
+    for key in keys:
+      store[key].resources()
+    print('%-32s %.3fs' % ('%d store field lookups' % len(keys), time.perf_counter() - start))
+    start = time.perf_counter()
+    for key in keys:
+      loaded[key].resources()
+    print('%-32s %.3fs' % ('%d loaded field lookups' % len(keys), time.perf_counter() - start))
+    store.close()
+  finally:
+    os.unlink(filename)
+
+
+if __name__ == '__main__':
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -3,13 +3,57 @@ __version__ = '0.8.3'
 __license__ = 'MIT'
 
 
+import importlib
 import sys
 
-from .base import Environment
-from .basic import Boolean, Enum, Float, Integer, String
-from .choice import Choice
-from .composite import Default, Empty, Required, Struct
-from .container import List, Map
-from .naming import Namable, Ref
-from .parsing import MustacheParser
-from .typing import Type, TypeCheck, TypeFactory
+# Public names and the submodules that provide them.  Submodules are imported on
+# first attribute access (PEP 562) so that short-lived processes only pay for
+# what they use.
+_EXPORTS = {
+  'Environment': 'base',
+  'Boolean': 'basic',
+  'Enum': 'basic',
+  'Float': 'basic',
+  'Integer': 'basic',
+  'String': 'basic',
+  'Choice': 'choice',
+  'Default': 'composite',
+  'Empty': 'composite',
+  'Required': 'composite',
+  'Struct': 'composite',
+  'List': 'container',
+  'Map': 'container',
+  'Namable': 'naming',
+  'Ref': 'naming',
+  'MustacheParser': 'parsing',
+  'Type': 'typing',
+  'TypeCheck': 'typing',
+  'TypeFactory': 'typing',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+  try:
+    module_name = _EXPORTS[name]
+  except KeyError:
+    # Submodules, e.g. pystachio.naming, are imported on access as well.
+    try:
+      return importlib.import_module('.' + name, __name__)
+    except ModuleNotFoundError as e:
+      if e.name != '%s.%s' % (__name__, name):
+        raise
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+  value = getattr(importlib.import_module('.' + module_name, __name__), name)
+  globals()[name] = value
+  return value
+
+
+def __dir__():
+  return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+  for _name in __all__:
+    __getattr__(_name)
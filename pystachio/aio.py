@@ -0,0 +1,121 @@
+"""
+  asyncio variants of interpolate() and check().
+
+  Walking large List and Map trees yields to the event loop periodically, and
+  Refs can be resolved through AsyncResolvers whose lookups run concurrently.
+  Results are those of the synchronous interpolate() and check(), up to the order
+  of the unbound Refs (as with interpolate_and_check()).
+"""
+
+import asyncio
+
+from .composite import Structural
+from .container import ListContainer, MapContainer
+from .naming import Namable
+from .resolver import BatchBinding
+
+
+class AsyncResolver(object):
+  """
+    An asynchronous source of values for Refs.  Implement either find(ref) for
+    per-Ref lookups, which are run concurrently, or resolve(refs) for batches.
+  """
+
+  async def find(self, ref):
+    """Return the value of ref, or raise Namable.NotFound."""
+    raise NotImplementedError
+
+  async def resolve(self, refs):
+    """Return a dict mapping those of the given Refs this resolver knows about to values."""
+    refs = list(refs)
+    values = await asyncio.gather(*[self.find(ref) for ref in refs], return_exceptions=True)
+    resolved = {}
+    for ref, value in zip(refs, values):
+      if isinstance(value, Namable.Error):
+        continue
+      elif isinstance(value, BaseException):
+        raise value
+      resolved[ref] = value
+    return resolved
+
+
+async def bind(obj, *resolvers):
+  """
+    Bind obj to the values its unbound Refs have in the given AsyncResolvers, which
+    are queried concurrently.  Earlier resolvers take precedence.
+  """
+  binding = BatchBinding(obj)
+  for refs in binding:
+    results = await asyncio.gather(*[resolver.resolve(refs) for resolver in resolvers])
+    resolved = {}
+    for result in reversed(results):
+      resolved.update(result)
+    binding.update(resolved)
+  return binding.bound()
+
+
+class Walker(object):
+  """
+    Walks an object tree as _interpolate_and_check() and check() do, yielding to the
+    event loop every YIELD_EVERY leaves.  Containers are descended into through their
+    _scoped_children() and their children's results combined by their _join_*()
+    methods, so results (and cached checks) are those of the synchronous traversals.
+  """
+
+  YIELD_EVERY = 100
+  CONTAINERS = (Structural, ListContainer, MapContainer)
+
+  def __init__(self, yield_every=None):
+    self._yield_every = yield_every or self.YIELD_EVERY
+    self._leaves = 0
+
+  async def _leaf(self):
+    self._leaves += 1
+    if self._leaves % self._yield_every == 0:
+      await asyncio.sleep(0)
+
+  async def _interpolate_and_check(self, obj, scopes):
+    if isinstance(obj, self.CONTAINERS):
+      results = []
+      for child, child_scopes in obj._scoped_children(scopes):
+        results.append(await self._interpolate_and_check(child, child_scopes))
+      return obj._join_interpolate_and_check(results)
+    await self._leaf()
+    return obj._interpolate_and_check(scopes)
+
+  async def _check(self, obj, scopes):
+    if not scopes or obj.is_literal():
+      # As with Object._check(), use (and fill) the cached check().
+      if obj._memo is not None and 'check' in obj._memo:
+        return obj._memo['check']
+      scopes = ()
+    if not isinstance(obj, self.CONTAINERS):
+      await self._leaf()
+      return obj._check(scopes)
+    checks = []
+    for child, child_scopes in obj._scoped_children(scopes):
+      checks.append(await self._check(child, child_scopes))
+    type_check = obj._join_check(checks)
+    return obj._memoize('check', lambda: type_check) if not scopes else type_check
+
+  async def interpolate(self, obj):
+    interpolated, unbound, _ = await self._interpolate_and_check(obj, ())
+    if interpolated is None:
+      # Raise whatever interpolate() raises.
+      return obj.interpolate()
+    return interpolated, list(unbound)
+
+  async def check(self, obj):
+    return await self._check(obj, ())
+
+
+async def interpolate(obj, *resolvers, yield_every=None):
+  if resolvers:
+    obj = await bind(obj, *resolvers)
+  return await Walker(yield_every).interpolate(obj)
+
+
+async def check(obj, *resolvers, yield_every=None):
+  if resolvers:
+    obj = await bind(obj, *resolvers)
+  return await Walker(yield_every).check(obj)
@@ -1,5 +1,4 @@
 import copy
-from pprint import pformat
 
 from .naming import Namable, Ref
 from .parsing import MustacheParser
@@ -72,6 +71,7 @@ class Environment(Namable):
     raise Namable.NotFound(self, ref)
 
   def __repr__(self):
+    from pprint import pformat
     return 'Environment(%s)' % pformat(self._table)
 
 
@@ -79,7 +79,7 @@ class Object(object):
   """
     Object base class, encapsulating a set of variable bindings scoped to this object.
   """
-  __slots__ = ('_scopes',)
+  __slots__ = ('_scopes', '_memo')
 
   class CoercionError(ValueError):
     def __init__(self, src, dst, message=None):
@@ -94,10 +94,24 @@ class Object(object):
 
   def __init__(self):
     self._scopes = ()
+    self._memo = None
 
   def get(self):
     raise NotImplementedError
 
+  def _memoize(self, key, compute):
+    """
+      Cache a derived value on this instance.  Objects are immutable once
+      constructed and scoped, so values derived from them never go stale.
+    """
+    if self._memo is None:
+      self._memo = {}
+    try:
+      return self._memo[key]
+    except KeyError:
+      value = self._memo[key] = compute()
+      return value
+
   def __hash__(self):
     si, _ = self.interpolate()
     return hash(si.get())
@@ -139,16 +153,152 @@ class Object(object):
   def scopes(self):
     return self._scopes
 
+  def is_literal(self):
+    """
+      True if this object contains no templates, in which case it interpolates to
+      the same value regardless of the scopes it is bound to.
+    """
+    return self._memoize('literal', self._is_literal)
+
+  def _is_literal(self):
+    # Objects that cannot tell are assumed to need interpolating.
+    return False
+
+  def _iter_free_refs(self, scopes):
+    """
+      Yield the Refs that interpolating this object within the given parent scopes
+      would leave unbound, without building interpolated copies.  By default the
+      object is interpolated to find them.
+    """
+    scoped = self.in_scope(*scopes) if scopes else self
+    for ref in scoped.interpolate()[1]:
+      yield ref
+
+  def free_refs(self):
+    """
+      Return the frozenset of Refs still needed to fully interpolate this object,
+      the same Refs as interpolate()[1].
+    """
+    return self._memoize('free_refs', lambda: frozenset(self._iter_free_refs(())))
+
+  def is_fully_bound(self):
+    """
+      True if this object has no unbound Refs.  Stops at the first unbound Ref found.
+    """
+    if self._memo is not None and 'free_refs' in self._memo:
+      return not self._memo['free_refs']
+    return self._memoize('fully_bound',
+        lambda: next(iter(self._iter_free_refs(())), None) is None)
+
+  def intern(self, table=None):
+    """
+      Return this object with each of its literal subtrees replaced by a canonical
+      instance, shared with every other object interned with the same table (a
+      pystachio.interning.InternTable).
+    """
+    from .interning import InternTable
+    return (InternTable() if table is None else table).intern(self)
+
   def check(self):
     """
-      Type check this object.
+      Type check this object.  The result is cached, so checking an object again, or
+      checking an object sharing it as a literal field, element or value, is free.
+    """
+    return self._memoize('check', lambda: self._uncached_check(()))
+
+  def _check(self, scopes):
+    """
+      check() of this object scoped to the given parent scopes.  Literal objects check
+      alike in any scope, so their cached check() is used.
+    """
+    if not scopes or self.is_literal():
+      return self.check()
+    return self._uncached_check(scopes)
+
+  def _uncached_check(self, scopes):
+    return self._interpolate_and_check(scopes)[2]
+
+  # Containers implement check() and interpolate_and_check() as a single traversal
+  # split into the three methods below, which pystachio.aio.Walker also drives.
+
+  def _scoped_children(self, scopes):
+    """
+      Yield (child, scopes) for each child the traversals of this object descend into,
+      where scopes are the parent scopes the child is interpolated or checked within.
     """
+    raise NotImplementedError
+
+  def _join_interpolate_and_check(self, results):
+    """
+      Combine the _interpolate_and_check() results of the children yielded by
+      _scoped_children(), in the same order, into the result for this object.  The
+      results are consumed only as far as needed.
+    """
+    raise NotImplementedError
+
+  def _join_check(self, checks):
+    """
+      Combine the _check() results of the children yielded by _scoped_children(), in
+      the same order, into the TypeCheck of this object.  The checks are consumed only
+      as far as needed, so the first failure stops the traversal.
+    """
+    raise NotImplementedError
+
+  def check_all(self, max_errors=None):
+    """
+      Type check this object, collecting every failure rather than stopping at the first.
+
+      Returns a list of (Ref, message) pairs, one per failing field, element, key or value,
+      where the Ref is its path from this object (e.g. processes[3].resources.ram), or the
+      empty Ref for this object itself.  If max_errors is given, stops once that many
+      failures have been found.  The list is empty if and only if check() succeeds.
+    """
+    errors = []
+    self._check_all((), (), errors, max_errors)
+    return [(Ref(path), message) for path, message in errors]
+
+  def _check_all(self, scopes, path, errors, max_errors):
+    """
+      Append (path components, message) to errors for each failure within this object,
+      scoped to the given parent scopes.
+    """
+    type_check = self._check(scopes)
+    if not type_check.ok():
+      errors.append((path, type_check.message()))
+
+  def interpolate_and_check(self):
+    """
+      Interpolate and type check this object in a single traversal.
+
+      Returns a 3-tuple:
+        The object as interpolate() would return it, or None if interpolate() would
+        raise.
+        The unbound Refs as interpolate() would return them.
+        The TypeCheck of this object, as check() would return it.
+    """
+    interpolated, unbound, type_check = self._interpolate_and_check(())
+    return interpolated, list(unbound), type_check
+
+  def _interpolate_and_check(self, scopes):
+    """
+      interpolate_and_check() of this object scoped to the given parent scopes,
+      without copying it into them.  Unbound Refs may be any iterable.
+    """
+    scoped = self.in_scope(*scopes) if scopes else self
     try:
-      si, uninterp = self.interpolate()
+      si, uninterp = scoped.interpolate()
     # TODO(wickman) This should probably be pushed out to the interpolate leaves.
     except (Object.CoercionError, MustacheParser.Uninterpolatable) as e:
-      return TypeCheck(False, "Unable to interpolate: %s" % e)
-    return self.checker(si)
+      return None, (), TypeCheck(False, "Unable to interpolate: %s" % e)
+    return si, uninterp, self.checker(si)
+
+  async def acheck(self, *resolvers):
+    """
+      asyncio variant of check() that periodically yields to the event loop,
+      optionally binding values from pystachio.aio.AsyncResolvers first.
+    """
+    from . import aio
+    return await aio.check(self, *resolvers)
 
   def __ne__(self, other):
     return not (self == other)
@@ -171,3 +321,11 @@ class Object(object):
       return.
     """
     raise NotImplementedError
+
+  async def ainterpolate(self, *resolvers):
+    """
+      asyncio variant of interpolate() that periodically yields to the event loop,
+      optionally binding values from pystachio.aio.AsyncResolvers first.
+    """
+    from . import aio
+    return await aio.interpolate(self, *resolvers)
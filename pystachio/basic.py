@@ -73,6 +73,36 @@ class SimpleObject(Object, Type):
         self_copy._value = self_copy.coerce(joins)
         return self_copy, unbound
 
+  def _interpolate_and_check(self, scopes):
+    value, unbound = self._value, ()
+    try:
+      if not isinstance(value, str):
+        interpolated = self.__class__(self.coerce(value))
+      elif '{{' not in value:
+        interpolated = self.__class__(self.coerce(value))
+      else:
+        scopes = self._scopes + scopes
+        value, unbound = MustacheParser.resolve(value, *scopes)
+        if unbound:
+          interpolated = self.__class__(value)
+        else:
+          interpolated = self.__class__(self.coerce(value))
+          interpolated._scopes = scopes
+    except (self.CoercionError, MustacheParser.Uninterpolatable) as e:
+      return None, (), TypeCheck(False, "Unable to interpolate: %s" % e)
+    return interpolated, unbound, self.checker(interpolated)
+
+  def _is_literal(self):
+    # Aliases such as {{&foo}} carry no Refs but still interpolate to templates.
+    return not isinstance(self._value, str) or '{{' not in self._value
+
+  def _iter_free_refs(self, scopes):
+    if self.is_literal():
+      return
+    _, unbound = MustacheParser.resolve(self._value, *(self._scopes + scopes))
+    for ref in unbound:
+      yield ref
+
   @classmethod
   def type_factory(cls):
     return cls.__name__
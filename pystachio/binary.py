@@ -0,0 +1,353 @@
+"""
+  A compact, schema-driven binary encoding of Pystachio objects.
+
+  Records carry no field names or type tags: a type's codec is derived from its
+  schema (Struct.TYPEMAP, List.TYPE, Map.KEYTYPE/VALUETYPE, Choice.CHOICES).
+
+    Struct   a bitmap of the fields that are set, then their values, in field
+             name order
+    List     a varint count, then the elements
+    Map      a varint count, then alternating keys and values
+    Choice   the index of the matching alternative, then its value
+    Integer  a zigzag varint
+    Float    an IEEE 754 double, little-endian
+    Boolean  one byte
+    String   a varint length, then UTF-8 (Enums too)
+
+  A stream is a header (magic, version and an 8-byte fingerprint of the type's
+  serialized schema) followed by records, each prefixed with its varint length.
+  Readers compare fingerprints before decoding anything, so data written with a
+  different schema is rejected up front.
+
+  Objects are encoded as interpolated, so every non-String leaf must be bound.
+"""
+
+import hashlib
+import json
+import struct
+from functools import lru_cache
+
+from .basic import Boolean, EnumContainer, Float, Integer, String
+from .choice import ChoiceContainer
+from .composite import Empty, Structural
+from .container import ListContainer, MapContainer
+from .decoder import gc_paused
+from .naming import frozendict
+
+MAGIC = b'PYSB'
+VERSION = 1
+HEADER_SIZE = len(MAGIC) + 1 + 8
+_DOUBLE = struct.Struct('<d')
+
+
+class SchemaMismatch(ValueError):
+  """Raised when data was written with a schema other than the reader's."""
+
+
+@lru_cache(maxsize=None)
+def fingerprint(cls):
+  """An 8-byte digest of the serialized schema of cls."""
+  schema = json.dumps(cls.serialize_type(), sort_keys=True, separators=(',', ':'))
+  return hashlib.sha1(schema.encode('utf-8')).digest()[:8]
+
+
+def header(cls):
+  return MAGIC + bytes([VERSION]) + fingerprint(cls)
+
+
+def check_header(cls, data, offset=0):
+  """Check the header at data[offset:] against cls, returning the offset past it."""
+  found = bytes(data[offset:offset + HEADER_SIZE])
+  if found[:len(MAGIC)] != MAGIC or found[len(MAGIC)] != VERSION:
+    raise ValueError('Not a version %d Pystachio binary stream.' % VERSION)
+  if found[len(MAGIC) + 1:] != fingerprint(cls):
+    raise SchemaMismatch('Stream was not written with the schema of %s.' % cls.__name__)
+  return offset + HEADER_SIZE
+
+
+def write_varint(out, value):
+  while value > 0x7f:
+    out.append((value & 0x7f) | 0x80)
+    value >>= 7
+  out.append(value)
+
+
+def read_varint(data, offset):
+  value, shift = 0, 0
+  while True:
+    byte = data[offset]
+    offset += 1
+    value |= (byte & 0x7f) << shift
+    if byte < 0x80:
+      return value, offset
+    shift += 7
+
+
+class Codec(object):
+  """Encodes and decodes records of a single type, without framing or headers."""
+
+  def __init__(self, cls):
+    self.cls = cls
+
+  def write(self, out, obj):
+    """Append the encoding of the interpolated, literal obj to the bytearray out."""
+    raise NotImplementedError
+
+  def read(self, data, offset):
+    """Decode an object from data at offset, returning it and the offset past it."""
+    raise NotImplementedError
+
+  def encode_record(self, obj):
+    if not obj.is_literal():
+      obj, _ = obj.interpolate()
+    out = bytearray()
+    self.write(out, obj)
+    return bytes(out)
+
+  def decode_record(self, data, offset=0):
+    return self.read(data, offset)
+
+
+class IntegerCodec(Codec):
+  def write(self, out, obj):
+    value = obj.coerce(obj._value)
+    write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+
+  def read(self, data, offset):
+    value, offset = read_varint(data, offset)
+    obj = self.cls.__new__(self.cls)
+    obj._value = (value >> 1) if not value & 1 else -((value + 1) >> 1)
+    obj._scopes, obj._memo = (), None
+    return obj, offset
+
+
+class FloatCodec(Codec):
+  def write(self, out, obj):
+    out += _DOUBLE.pack(obj.coerce(obj._value))
+
+  def read(self, data, offset):
+    obj = self.cls.__new__(self.cls)
+    obj._value, obj._scopes, obj._memo = _DOUBLE.unpack_from(data, offset)[0], (), None
+    return obj, offset + 8
+
+
+class BooleanCodec(Codec):
+  def write(self, out, obj):
+    out.append(1 if obj.coerce(obj._value) else 0)
+
+  def read(self, data, offset):
+    obj = self.cls.__new__(self.cls)
+    obj._value, obj._scopes, obj._memo = data[offset] == 1, (), None
+    return obj, offset + 1
+
+
+class StringCodec(Codec):
+  def write(self, out, obj):
+    encoded = obj.coerce(obj._value).encode('utf-8')
+    write_varint(out, len(encoded))
+    out += encoded
+
+  def read(self, data, offset):
+    length = data[offset]
+    if length < 0x80:
+      offset += 1
+    else:
+      length, offset = read_varint(data, offset)
+    end = offset + length
+    obj = self.cls.__new__(self.cls)
+    obj._value, obj._scopes, obj._memo = str(data[offset:end], 'utf-8'), (), None
+    return obj, end
+
+
+class StructCodec(Codec):
+  def __init__(self, cls):
+    super(StructCodec, self).__init__(cls)
+    # (name, codec, bitmap byte, bitmap bit) in field name order.
+    self.fields = [(name, compile_codec(cls.TYPEMAP[name].klazz), index >> 3, 1 << (index & 7))
+                   for index, name in enumerate(sorted(cls.TYPEMAP))]
+    self.defaults = dict((name, sig.default) for name, sig in cls.TYPEMAP.items())
+    self.bitmap_size = (len(self.fields) + 7) // 8
+
+  def write(self, out, obj):
+    bitmap_offset = len(out)
+    out += bytes(self.bitmap_size)
+    schema_data = obj._schema_data
+    for name, codec, byte, bit in self.fields:
+      value = schema_data[name]
+      if value is not Empty:
+        out[bitmap_offset + byte] |= bit
+        codec.write(out, value)
+
+  def read(self, data, offset):
+    bitmap = data[offset:offset + self.bitmap_size]
+    offset += self.bitmap_size
+    schema_data = frozendict(self.defaults)
+    for name, codec, byte, bit in self.fields:
+      if bitmap[byte] & bit:
+        schema_data[name], offset = codec.read(data, offset)
+    obj = self.cls.__new__(self.cls)
+    obj._schema_data, obj._scopes, obj._memo = schema_data, (), None
+    return obj, offset
+
+
+class ListCodec(Codec):
+  def __init__(self, cls):
+    super(ListCodec, self).__init__(cls)
+    self.element = compile_codec(cls.TYPE)
+
+  def write(self, out, obj):
+    write_varint(out, len(obj._values))
+    for element in obj._values:
+      self.element.write(out, element)
+
+  def read(self, data, offset):
+    count, offset = read_varint(data, offset)
+    values = []
+    for _ in range(count):
+      element, offset = self.element.read(data, offset)
+      values.append(element)
+    obj = self.cls.__new__(self.cls)
+    obj._values, obj._scopes, obj._memo = tuple(values), (), None
+    return obj, offset
+
+
+class MapCodec(Codec):
+  def __init__(self, cls):
+    super(MapCodec, self).__init__(cls)
+    self.key = compile_codec(cls.KEYTYPE)
+    self.value = compile_codec(cls.VALUETYPE)
+
+  def write(self, out, obj):
+    write_varint(out, len(obj._map))
+    for key, value in obj._map:
+      self.key.write(out, key)
+      self.value.write(out, value)
+
+  def read(self, data, offset):
+    count, offset = read_varint(data, offset)
+    pairs = []
+    for _ in range(count):
+      key, offset = self.key.read(data, offset)
+      value, offset = self.value.read(data, offset)
+      pairs.append((key, value))
+    obj = self.cls.__new__(self.cls)
+    obj._map, obj._scopes, obj._memo = tuple(pairs), (), None
+    return obj, offset
+
+
+class ChoiceCodec(Codec):
+  def __init__(self, cls):
+    super(ChoiceCodec, self).__init__(cls)
+    self.choices = [compile_codec(choice) for choice in cls.CHOICES]
+
+  def write(self, out, obj):
+    value, _ = obj.interpolate()
+    for index, choice in enumerate(self.cls.CHOICES):
+      if isinstance(value, choice):
+        out.append(index)
+        self.choices[index].write(out, value)
+        return
+    raise obj.CoercionError(obj._value, self.cls)
+
+  def read(self, data, offset):
+    value, offset = self.choices[data[offset]].read(data, offset + 1)
+    obj = self.cls.__new__(self.cls)
+    obj._value, obj._scopes, obj._memo = value, (), None
+    return obj, offset
+
+
+@lru_cache(maxsize=None)
+def compile_codec(cls):
+  """The Codec for records of the Pystachio type cls."""
+  if issubclass(cls, Structural):
+    return StructCodec(cls)
+  elif issubclass(cls, ListContainer):
+    return ListCodec(cls)
+  elif issubclass(cls, MapContainer):
+    return MapCodec(cls)
+  elif issubclass(cls, ChoiceContainer):
+    return ChoiceCodec(cls)
+  elif issubclass(cls, Boolean):
+    return BooleanCodec(cls)
+  elif issubclass(cls, Integer):
+    return IntegerCodec(cls)
+  elif issubclass(cls, Float):
+    return FloatCodec(cls)
+  elif issubclass(cls, (String, EnumContainer)):
+    return StringCodec(cls)
+  raise TypeError('No binary encoding for %s' % cls.__name__)
+
+
+def _frame(out, record):
+  write_varint(out, len(record))
+  out += record
+
+
+def encode(obj):
+  """Encode obj as a stream of one record."""
+  out = bytearray(header(obj.__class__))
+  _frame(out, compile_codec(obj.__class__).encode_record(obj))
+  return bytes(out)
+
+
+def decode(cls, data):
+  """Decode the first record of the stream in data (bytes-like) as an instance of cls."""
+  offset = check_header(cls, data)
+  _, offset = read_varint(data, offset)
+  with gc_paused():
+    obj, _ = compile_codec(cls).decode_record(data, offset)
+  return obj
+
+
+def dump(cls, iterable, fp):
+  """Write the instances of cls in iterable to the binary file object fp as a stream."""
+  codec = compile_codec(cls)
+  fp.write(header(cls))
+  count = 0
+  for obj in iterable:
+    out = bytearray()
+    _frame(out, codec.encode_record(obj))
+    fp.write(out)
+    count += 1
+  return count
+
+
+def _read_exactly(fp, size):
+  data = fp.read(size)
+  if len(data) != size:
+    raise ValueError('Truncated Pystachio binary stream.')
+  return data
+
+
+def iter_decode(cls, fp, buffer_size=1 << 16):
+  """
+    Yield the instances of cls in the stream read from the binary file object fp,
+    buffer_size bytes at a time.
+  """
+  check_header(cls, _read_exactly(fp, HEADER_SIZE))
+  codec = compile_codec(cls)
+  buf, offset, eof = b'', 0, False
+
+  def fill(needed):
+    nonlocal buf, offset, eof
+    while not eof and len(buf) - offset < needed:
+      chunk = fp.read(max(buffer_size, needed))
+      eof = not chunk
+      buf, offset = buf[offset:] + chunk, 0
+
+  while True:
+    # A varint length prefix is at most 10 bytes long.
+    fill(10)
+    if offset == len(buf):
+      return
+    try:
+      length, start = read_varint(buf, offset)
+    except IndexError:
+      raise ValueError('Truncated Pystachio binary stream.')
+    size = start - offset + length
+    fill(size)
+    if len(buf) - offset < size:
+      raise ValueError('Truncated Pystachio binary stream.')
+    obj, _ = codec.decode_record(buf, offset + size - length)
+    offset += size
+    yield obj
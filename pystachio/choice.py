@@ -1,5 +1,6 @@
 # Choice types: types that can take one of a group of selected types.
 from .base import Object
+from .parsing import MustacheParser
 from .typing import Type, TypeCheck, TypeFactory, TypeMetaclass
 
 
@@ -104,7 +105,7 @@ class ChoiceContainer(Object, Type):
           pass
     return err_fun(self._value)
 
-  def check(self):
+  def _uncached_check(self, scopes):
     # Try each of the options in sequence:
     # There are three cases for matching depending on the value:
     # (1) It's a pystachio value, and its type is the type alternative. Then typecheck
@@ -115,8 +116,10 @@ class ChoiceContainer(Object, Type):
     #  If it succeeds, then the typecheck succeeds. Otherwise, it proceeds to the next
     #  type alternative.
     # If none of the type alternatives succeed, then the check fails. match
+    scoped = self.in_scope(*scopes) if scopes else self
+
     def _check(v):
-      tc = v.in_scope(*self.scopes()).check()
+      tc = v.in_scope(*scoped.scopes()).check()
       if tc.ok():
         return tc
 
@@ -125,7 +128,17 @@ class ChoiceContainer(Object, Type):
         "%s typecheck failed: value %s did not match any of its alternatives" %
         (self.__class__.__name__, v))
 
-    return self._unwrap(_check, _err)
+    return scoped._unwrap(_check, _err)
+
+  def _interpolate_and_check(self, scopes):
+    # Alternatives are matched differently by check() and interpolate(), so run both.
+    scoped = self.in_scope(*scopes) if scopes else self
+    type_check = scoped._uncached_check(())
+    try:
+      interpolated, unbound = scoped.interpolate()
+    except (self.CoercionError, MustacheParser.Uninterpolatable):
+      return None, (), type_check
+    return interpolated, unbound, type_check
 
   def interpolate(self):
     def _inter(v):
@@ -136,6 +149,23 @@ class ChoiceContainer(Object, Type):
 
     return self._unwrap(_inter, _err)
 
+  def _is_literal(self):
+    if isinstance(self._value, Object):
+      return self._value.is_literal()
+    return not isinstance(self._value, str) or '{{' not in self._value
+
+  def _iter_free_refs(self, scopes):
+    scopes = self._scopes + scopes
+
+    def _free(v):
+      return (list(v._iter_free_refs(scopes)),)
+
+    def _err(v):
+      raise self.CoercionError(self._value, self.__class__)
+
+    for ref in self._unwrap(_free, _err)[0]:
+      yield ref
+
   @classmethod
   def type_factory(cls):
     return 'Choice'
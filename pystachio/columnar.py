@@ -0,0 +1,209 @@
+"""
+  Columnar storage for large numbers of literal Structs of one schema.
+
+  A StructArray stores each leaf field of its schema, including the fields of
+  nested Structs (addressed by dotted paths such as 'resources.cpu'), as one
+  column of plain values: an array.array for Integer and Float fields, and a
+  list otherwise.  Filters, projections and aggregations run over the columns;
+  Struct instances are only built when records are accessed.
+
+    >>> processes = StructArray(Process, fleet)
+    >>> big = processes.filter('resources.cpu', lambda cpu: cpu >= 4)
+    >>> big.sum('resources.ram'), big[0]
+"""
+
+import array
+import itertools
+
+from .basic import Float, Integer, SimpleObject
+from .composite import Empty, Structural
+from .decoder import compile_decoder
+
+
+class StructArray(object):
+  """An array of fully bound Structs of one schema, stored column by column."""
+
+  TYPECODES = ((Integer, 'q'), (Float, 'd'))
+
+  def __init__(self, schema, records=()):
+    if not issubclass(schema, Structural):
+      raise TypeError('StructArray schemas must be Structs, got %s' % schema.__name__)
+    self.schema = schema
+    # Struct-typed paths (parents before children), then leaf paths, as
+    # (path, parent path, field name, type).
+    self._structs, self._leaves = [], []
+    self._layout(schema, '')
+    self._columns = dict((path, self._empty_column(klazz)) for path, _, _, klazz in self._leaves)
+    # Whether each nested Struct is set; a leaf under an unset Struct is None.
+    self._present = dict((path, []) for path, _, _, _ in self._structs)
+    self._length = 0
+    self.extend(records)
+
+  def _layout(self, schema, prefix):
+    for name in schema.TYPEMAP:
+      klazz = schema.TYPEMAP[name].klazz
+      path = prefix + name
+      if issubclass(klazz, Structural):
+        self._structs.append((path, prefix[:-1], name, klazz))
+        self._layout(klazz, path + '.')
+      else:
+        self._leaves.append((path, prefix[:-1], name, klazz))
+
+  @classmethod
+  def _empty_column(cls, klazz):
+    for base, typecode in cls.TYPECODES:
+      if issubclass(klazz, base):
+        return array.array(typecode)
+    return []
+
+  @classmethod
+  def _plain(cls, value):
+    if isinstance(value, SimpleObject):
+      return value.coerce(value._value)
+    interpolated, _ = value.interpolate()
+    return interpolated.get()
+
+  def _new(self):
+    return self.__class__(self.schema)
+
+  def __len__(self):
+    return self._length
+
+  def append(self, record):
+    """Append a Struct (or a Mapping coercible to one), which must be fully bound."""
+    if not isinstance(record, self.schema):
+      record = self.schema(record)
+    if not record.is_literal():
+      record, unbound = record.interpolate()
+      if unbound or not record.is_literal():
+        raise ValueError('StructArray records must be fully bound, %s is not.' % record)
+    parents = {'': record}
+    for path, parent_path, name, _ in self._structs:
+      parent = parents[parent_path]
+      value = Empty if parent is Empty else parent._schema_data[name]
+      parents[path] = value
+      self._present[path].append(value is not Empty)
+    for path, parent_path, name, _ in self._leaves:
+      parent = parents[parent_path]
+      value = Empty if parent is Empty else parent._schema_data[name]
+      self._append_value(path, None if value is Empty else self._plain(value))
+    self._length += 1
+
+  def _append_value(self, path, value):
+    column = self._columns[path]
+    if isinstance(column, array.array):
+      if value is None:
+        column = self._columns[path] = column.tolist()
+      else:
+        try:
+          column.append(value)
+          return
+        except OverflowError:
+          column = self._columns[path] = column.tolist()
+    column.append(value)
+
+  def extend(self, records):
+    for record in records:
+      self.append(record)
+
+  def _record_data(self, index):
+    data = {}
+    for path, _, _, _ in self._structs:
+      if self._present[path][index]:
+        data[path] = {}
+    for path, _, _, _ in self._leaves:
+      value = self._columns[path][index]
+      if value is not None:
+        data[path] = value
+    root = {}
+    for path, value in sorted(data.items()):
+      parent, _, name = path.rpartition('.')
+      (data[parent] if parent else root)[name] = value
+    return root
+
+  def __getitem__(self, index):
+    if isinstance(index, slice):
+      return self.select(range(self._length)[index])
+    if index < 0:
+      index += self._length
+    if not 0 <= index < self._length:
+      raise IndexError('StructArray index out of range')
+    return compile_decoder(self.schema, trusted=True)(self._record_data(index))
+
+  def __iter__(self):
+    for index in range(self._length):
+      yield self[index]
+
+  def column(self, path):
+    """The values of the field at path, None where it is Empty."""
+    try:
+      return self._columns[path]
+    except KeyError:
+      raise KeyError('%s has no leaf field %s' % (self.schema.__name__, path))
+
+  def project(self, *paths):
+    """A dict mapping each of the given paths to its column."""
+    return dict((path, self.column(path)) for path in paths)
+
+  def mask(self, path, predicate):
+    """A list of whether predicate holds of each record's value at path (False if Empty)."""
+    return [value is not None and bool(predicate(value)) for value in self.column(path)]
+
+  def select(self, selector):
+    """
+      A new StructArray of the records selected by selector, either a sequence of
+      booleans, one per record, or a sequence of record indices.
+    """
+    selector = list(selector)
+    if len(selector) == self._length and all(isinstance(s, bool) for s in selector):
+      indices = list(itertools.compress(range(self._length), selector))
+    else:
+      indices = selector
+    selected = self._new()
+    for path, column in self._columns.items():
+      values = [column[index] for index in indices]
+      if isinstance(column, array.array):
+        selected._columns[path] = array.array(column.typecode, values)
+      else:
+        selected._columns[path] = values
+    for path, present in self._present.items():
+      selected._present[path] = [present[index] for index in indices]
+    selected._length = len(indices)
+    return selected
+
+  def filter(self, path, predicate):
+    """A new StructArray of the records whose value at path satisfies predicate."""
+    return self.select(self.mask(path, predicate))
+
+  def values(self, path):
+    """The values at path, skipping Empty ones."""
+    column = self.column(path)
+    if isinstance(column, array.array):
+      return column
+    return [value for value in column if value is not None]
+
+  def count(self, path):
+    return len(self.values(path))
+
+  def sum(self, path):
+    return sum(self.values(path))
+
+  def min(self, path):
+    return min(self.values(path))
+
+  def max(self, path):
+    return max(self.values(path))
+
+  def mean(self, path):
+    values = self.values(path)
+    return sum(values) / float(len(values)) if len(values) else None
+
+  def group_by(self, path):
+    """A dict mapping each value at path (None if Empty) to the StructArray of its records."""
+    groups = {}
+    for index, value in enumerate(self.column(path)):
+      groups.setdefault(value, []).append(index)
+    return dict((value, self.select(indices)) for value, indices in groups.items())
+
+  def __repr__(self):
+    return 'StructArray(%s, %d records)' % (self.schema.__name__, self._length)
@@ -1,10 +1,9 @@
 import copy
-import json
 from collections.abc import Mapping
 from inspect import isclass
 
 from .base import Environment, Object
-from .naming import Namable, frozendict
+from .naming import Namable, Ref, frozendict
 from .typing import Type, TypeCheck, TypeFactory, TypeMetaclass
 
 
@@ -213,8 +212,12 @@ class Structural(Object, Type, Namable):
     return hash(self.get())
 
   def __eq__(self, other):
+    if self is other: return True
     if not isinstance(other, Structural): return False
     if self.TYPEMAP != other.TYPEMAP: return False
+    if self.is_literal() and other.is_literal():
+      # Fields compare interpolated themselves, and shared ones compare by identity.
+      return self._schema_data == other._schema_data
     si = self.interpolate()
     oi = other.interpolate()
     return si[0]._schema_data == oi[0]._schema_data
@@ -240,20 +243,88 @@ class Structural(Object, Type, Namable):
 
     return lambda: self.interpolate_key(attr)
 
-  def check(self):
-    scopes = self.scopes()
+  def _scoped_children(self, scopes):
+    """Non-Empty fields in schema order; literal fields are yielded without scopes."""
+    # Literal fields interpolate alike in any scope, so scopes are only composed if needed.
+    composed = None
+    for name in self.TYPEMAP:
+      value = self._schema_data[name]
+      if value is Empty:
+        continue
+      if value.is_literal():
+        yield value, ()
+      else:
+        if composed is None:
+          composed = self._compose_scopes(self._scopes + scopes)
+        yield value, composed
+
+  def _interpolate_and_check(self, scopes):
+    return self._join_interpolate_and_check(child._interpolate_and_check(child_scopes)
+        for child, child_scopes in self._scoped_children(scopes))
+
+  def _join_interpolate_and_check(self, results):
+    results = iter(results)
+    type_check, unbound, schema_data = None, set(), frozendict()
     for name, signature in self.TYPEMAP.items():
-      if self._schema_data[name] is Empty and signature.required:
-        return TypeCheck.failure('%s[%s] is required.' % (self.__class__.__name__, name))
-      elif self._schema_data[name] is not Empty:
-        type_check = self._schema_data[name].in_scope(*scopes).check()
-        if type_check.ok():
-          continue
-        else:
-          return TypeCheck.failure('%s[%s] failed: %s' % (self.__class__.__name__, name,
-            type_check.message()))
+      if self._schema_data[name] is Empty:
+        if type_check is None and signature.required:
+          type_check = TypeCheck.failure('%s[%s] is required.' % (self.__class__.__name__, name))
+        if schema_data is not None:
+          schema_data[name] = Empty
+        continue
+      vinterp, vunbound, vcheck = next(results)
+      if type_check is None and not vcheck.ok():
+        type_check = TypeCheck.failure('%s[%s] failed: %s' % (self.__class__.__name__, name,
+          vcheck.message()))
+      if vinterp is None:
+        # interpolate() would raise, so only the type check is left to finish.
+        schema_data = None
+        if type_check is not None:
+          break
+      elif schema_data is not None:
+        schema_data[name] = vinterp
+        unbound.update(vunbound)
+    if schema_data is None:
+      return None, (), type_check
+    interpolated = self.__class__.__new__(self.__class__)
+    interpolated._schema_data, interpolated._scopes, interpolated._memo = schema_data, (), None
+    return interpolated, unbound, type_check or TypeCheck.success()
+
+  def _uncached_check(self, scopes):
+    return self._join_check(child._check(child_scopes)
+        for child, child_scopes in self._scoped_children(scopes))
+
+  def _join_check(self, checks):
+    # Required fields that are Empty fail without a result to consume.
+    checks = iter(checks)
+    for name, signature in self.TYPEMAP.items():
+      if self._schema_data[name] is Empty:
+        if signature.required:
+          return TypeCheck.failure('%s[%s] is required.' % (self.__class__.__name__, name))
+        continue
+      type_check = next(checks)
+      if not type_check.ok():
+        return TypeCheck.failure('%s[%s] failed: %s' % (self.__class__.__name__, name,
+          type_check.message()))
     return TypeCheck.success()
 
+  def _check_all(self, scopes, path, errors, max_errors):
+    composed = None
+    for name, signature in self.TYPEMAP.items():
+      if max_errors is not None and len(errors) >= max_errors:
+        return
+      value = self._schema_data[name]
+      if value is Empty:
+        if signature.required:
+          errors.append((path + (Ref.Dereference(name),),
+              '%s[%s] is required.' % (self.__class__.__name__, name)))
+      elif value.is_literal():
+        value._check_all((), path + (Ref.Dereference(name),), errors, max_errors)
+      else:
+        if composed is None:
+          composed = self._compose_scopes(self._scopes + scopes)
+        value._check_all(composed, path + (Ref.Dereference(name),), errors, max_errors)
+
   @classmethod
   def _cast_scopes_to_child(cls, scopes):
     return tuple(Environment({'super': scope}) for scope in scopes)
@@ -263,9 +334,25 @@ class Structural(Object, Type, Namable):
                        if value is not Empty))
 
   def scopes(self):
+    return self._compose_scopes(self._scopes)
+
+  def _compose_scopes(self, scopes):
+    """The scopes in which this object's fields are interpolated, given its own scopes."""
     self_scope = self._self_scope()
-    return (Environment({'self': self_scope}), self_scope,) + self._scopes + (
-        self._cast_scopes_to_child(self._scopes))
+    return (Environment({'self': self_scope}), self_scope,) + scopes + (
+        self._cast_scopes_to_child(scopes))
+
+  def _is_literal(self):
+    return all(value.is_literal() for value in self._schema_data.values() if value is not Empty)
+
+  def _iter_free_refs(self, scopes):
+    if self.is_literal():
+      return
+    scopes = self._compose_scopes(self._scopes + scopes)
+    for value in self._schema_data.values():
+      if value is not Empty:
+        for ref in value._iter_free_refs(scopes):
+          yield ref
 
   def interpolate(self):
     unbound = set()
@@ -307,21 +394,63 @@ class Structural(Object, Type, Namable):
     return result
 
   @classmethod
-  def json_load(cls, fp, strict=False):
-    return cls(json.load(fp) if strict else cls._filter_against_schema(json.load(fp)))
+  def json_load(cls, fp, strict=False, trusted=False):
+    from . import decoder
+    return decoder.load(cls, fp, strict, trusted)
+
+  @classmethod
+  def json_loads(cls, json_string, strict=False, trusted=False):
+    """
+      Load an instance from its JSON representation.  Keys unknown to the schema
+      are dropped, or raise AttributeError if strict.  Pass trusted=True for
+      input produced by json_dumps() to skip re-checking it while decoding.
+    """
+    from . import decoder
+    return decoder.loads(cls, json_string, strict, trusted)
+
+  @classmethod
+  def from_records(cls, records, strict=True, processes=None, chunksize=1024):
+    """
+      Build instances from an iterable of Mappings, compiling the coercion of
+      the schema once for the whole batch.  Returns (instances, errors); see
+      pystachio.decoder.decode_records.
+    """
+    from . import decoder
+    return decoder.decode_records(cls, records, strict, processes, chunksize)
+
+  @classmethod
+  def validate_raw(cls, data, strict=True):
+    """
+      Type check a plain Mapping (e.g. parsed JSON) as cls(data).check() would,
+      without constructing any objects.  Returns a TypeCheck, failing rather
+      than raising where cls(data) would raise.  See pystachio.validator.
+    """
+    from . import validator
+    return validator.validate(cls, data, strict)
+
+  @classmethod
+  def iter_jsonl(cls, fp, strict=False, trusted=False, check=False, processes=None,
+                 chunksize=256):
+    """
+      Stream instances from a JSON Lines file object, one per non-blank line.
+      See pystachio.jsonl.iter_jsonl.
+    """
+    from . import jsonl
+    return jsonl.iter_jsonl(cls, fp, strict, trusted, check, processes, chunksize)
 
   @classmethod
-  def json_loads(cls, json_string, strict=False):
-    return cls(json.loads(json_string) if strict
-               else cls._filter_against_schema(json.loads(json_string)))
+  def dump_jsonl(cls, iterable, fp):
+    """Write instances to a JSON Lines file object, returning the number written."""
+    from . import jsonl
+    return jsonl.dump_jsonl(cls, iterable, fp)
 
   def json_dump(self, fp):
-    d, _ = self.interpolate()
-    return json.dump(d.get(), fp)
+    from . import encoder
+    return encoder.dump(self, fp)
 
   def json_dumps(self):
-    d, _ = self.interpolate()
-    return json.dumps(d.get())
+    from . import encoder
+    return encoder.dumps(self)
 
   def find(self, ref):
     if not ref.is_dereference():
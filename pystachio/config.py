@@ -1,10 +1,12 @@
+import copy
+import hashlib
+import importlib.util
+import marshal
 import os
-from functools import reduce
-
-try:
-  import pkg_resources
-except ImportError:
-  pkg_resources = None
+import sys
+import time
+import types
+from functools import lru_cache, reduce
 
 
 def relativize(from_path, include_path):
@@ -17,6 +19,102 @@ def exec_function(ast, globals_map):
     return locals_map
 
 
+class CodeCache(object):
+  """
+    A .pyc-style cache of compiled config code objects.
+
+    Entries are marshalled code objects stored in a cache directory, keyed by
+    the include path, a hash of the source and the interpreter's bytecode magic
+    number, so stale or foreign entries are never loaded.
+  """
+
+  SUFFIX = '.pystachioc'
+
+  def __init__(self, cache_dir):
+    self._cache_dir = cache_dir
+
+  @property
+  def cache_dir(self):
+    return self._cache_dir
+
+  @classmethod
+  def _source_bytes(cls, data):
+    return data if isinstance(data, bytes) else data.encode('utf-8')
+
+  def cache_path(self, filename, data):
+    digest = hashlib.sha1(importlib.util.MAGIC_NUMBER)
+    digest.update(filename.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(self._source_bytes(data))
+    return os.path.join(self._cache_dir, digest.hexdigest() + self.SUFFIX)
+
+  def load(self, filename, data):
+    """Return the cached code object for this source, or None on a miss."""
+    try:
+      with open(self.cache_path(filename, data), 'rb') as fp:
+        return marshal.load(fp)
+    except (OSError, EOFError, ValueError, TypeError):
+      return None
+
+  def store(self, filename, data, code):
+    try:
+      os.makedirs(self._cache_dir, exist_ok=True)
+      # Created subject to the umask, unlike mkstemp, so that processes running as
+      # other users can share the cache.
+      tmp_path = os.path.join(self._cache_dir, '.tmp-' + os.urandom(8).hex())
+      fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    except OSError:
+      return
+    try:
+      with os.fdopen(fd, 'wb') as fp:
+        marshal.dump(code, fp)
+      os.replace(tmp_path, self.cache_path(filename, data))
+    except OSError:
+      try:
+        os.unlink(tmp_path)
+      except OSError:
+        pass
+
+  def compile(self, data, filename):
+    code = self.load(filename, data)
+    if code is None:
+      code = compile(data, filename, 'exec')
+      self.store(filename, data, code)
+    return code
+
+
+@lru_cache(maxsize=16)
+def compile_schema(schema):
+  return compile(schema, "<exec_function>", "exec")
+
+
+class IncludeNode(object):
+  """
+    A file executed while loading a Config.
+
+    includes: the resolved paths of the files it included, in order.
+    load_time: seconds spent compiling and executing it, including its own includes.
+    defines: top-level names first bound by the file itself (not by its includes).
+    rebinds: top-level names bound before the file ran that the file itself rebound.
+    visible: top-level names already bound when the file started executing.
+
+    defines, rebinds and visible are only recorded by loads that track definitions (see
+    Config), and are empty otherwise.
+  """
+
+  def __init__(self, path):
+    self.path = path
+    self.includes = []
+    self.load_time = None
+    self.defines = frozenset()
+    self.rebinds = frozenset()
+    self.visible = frozenset()
+
+  def __repr__(self):
+    return 'IncludeNode(%r, includes=%r, load_time=%r)' % (
+        self.path, self.includes, self.load_time)
+
+
 class ConfigContext(object):
   ROOT = ''
 
@@ -29,13 +127,71 @@ class ConfigContext(object):
   def from_key(cls, key):
     return key.split('\0')
 
-  def __init__(self, environment, loadables):
+  @classmethod
+  def resolve(cls, from_path, include_string=None):
+    """The normalized path of a file, used to identify it in the include graph."""
+    path = from_path if include_string is None else relativize(from_path, include_string)
+    return cls.ROOT if path == cls.ROOT else os.path.normpath(path)
+
+  def __init__(self, environment, loadables, code_cache=None, dedupe=True, executed=(),
+               track_definitions=False):
     self.environment = environment
     self.loadables = loadables
+    self.code_cache = code_cache
+    self.dedupe = dedupe
+    self.executed = frozenset(executed)
+    self.track_definitions = track_definitions
+    self.include_graph = {self.ROOT: IncludeNode(self.ROOT)}
+    self._touched_stack = []
 
   def compile(self, from_path, include_string, data):
     self.loadables[self.key(from_path, include_string)] = data
-    exec_function(compile(data, include_string, 'exec'), self.environment)
+    path = self.resolve(from_path, include_string)
+    parent_path = self.resolve(from_path)
+    parent = self.include_graph.setdefault(parent_path, IncludeNode(parent_path))
+    if path not in parent.includes:
+      parent.includes.append(path)
+    if self.dedupe and path in self.executed:
+      return
+    if path in self.include_graph:
+      if self.dedupe:
+        return
+      node = self.include_graph[path]
+    else:
+      node = self.include_graph[path] = IncludeNode(path)
+    start = time.time()
+    if self.code_cache is not None:
+      code = self.code_cache.compile(data, include_string)
+    else:
+      code = compile(data, include_string, 'exec')
+    if self.track_definitions:
+      before = self.environment.copy()
+      self._touched_stack.append({})
+      try:
+        exec_function(code, self.environment)
+      finally:
+        nested = self._touched_stack.pop()
+      self._record_definitions(node, before, nested)
+    else:
+      exec_function(code, self.environment)
+    node.load_time = (node.load_time or 0) + time.time() - start
+
+  def _record_definitions(self, node, before, nested):
+    """
+      Attribute the names bound while executing a file to the file itself, as opposed
+      to its includes.  `nested` maps the names its includes bound to the values they
+      left behind.
+    """
+    missing = object()
+    touched = dict((name, value) for name, value in self.environment.items()
+                   if before.get(name, missing) is not value)
+    own = set(name for name, value in touched.items()
+              if nested.get(name, missing) is not value)
+    node.defines = frozenset(name for name in own if name not in before and name not in nested)
+    node.rebinds = frozenset(own - node.defines)
+    node.visible = frozenset(before)
+    if self._touched_stack:
+      self._touched_stack[-1].update(touched)
 
 
 class ConfigExecutor(object):
@@ -74,17 +230,42 @@ class FileExecutor(ConfigExecutor):
     return ast_executor, loadable
 
 
+class PackageResource(object):
+  """The subset of the importlib.resources Traversable API backed by pkg_resources."""
+
+  def __init__(self, package, resource):
+    self.package = package
+    self.resource = resource
+
+  def is_file(self):
+    import pkg_resources
+    return pkg_resources.resource_exists(self.package, self.resource) and (
+        not pkg_resources.resource_isdir(self.package, self.resource))
+
+  def read_bytes(self):
+    import pkg_resources
+    return pkg_resources.resource_string(self.package, self.resource)
+
+
 class ResourceExecutor(FileExecutor):
   @classmethod
-  def resource_exists(cls, loadable):
-    if pkg_resources is None:
-      return False
+  def resource(cls, loadable):
+    """Return the importlib.resources Traversable backing a loadable."""
     module_base, module_file = os.path.split(loadable)
     module_base = module_base.replace(os.sep, '.')
+    # Imported lazily so that `import pystachio` does not pay for it.
     try:
-      return pkg_resources.resource_exists(module_base, module_file) and (
-          not pkg_resources.resource_isdir(module_base, module_file))
-    except (ValueError, ImportError):
+      from importlib.resources import files
+    except ImportError:
+      # importlib.resources.files() is only available from Python 3.9.
+      return PackageResource(module_base, module_file)
+    return files(module_base).joinpath(module_file)
+
+  @classmethod
+  def resource_exists(cls, loadable):
+    try:
+      return cls.resource(loadable).is_file()
+    except (ValueError, ImportError, TypeError):
       return False
 
   @classmethod
@@ -94,10 +275,7 @@ class ResourceExecutor(FileExecutor):
   @classmethod
   def compile_into(cls, context, from_path, config_file):
     actual_file = relativize(from_path, config_file)
-    module_base, module_file = os.path.split(actual_file)
-    module_base = module_base.replace(os.sep, '.')
-    context.compile(from_path, config_file,
-        pkg_resources.resource_string(module_base, module_file))
+    context.compile(from_path, config_file, cls.resource(actual_file).read_bytes())
 
 
 class LoadableMapExecutor(ConfigExecutor):
@@ -143,6 +321,155 @@ class FilelikeExecutor(ConfigExecutor):
     return ast_executor, loadable
 
 
+class ConfigSnapshot(object):
+  """
+    A frozen, fully loaded Config environment (schema and prelude includes) that
+    can be cloned as the starting point of many subsequent Config loads.
+
+    Each clone gets its own namespace, so configs loaded on top of a snapshot
+    may rebind names freely without affecting the snapshot or each other.
+    Mutable builtin containers and instances of config-defined classes are
+    copied per clone; Pystachio objects are immutable and therefore shared.
+    Functions and classes defined by config files are rebuilt for each clone, so
+    that the globals they read and write are the clone's own.  Subclasses and
+    instances of rebuilt classes are rebuilt and copied along with them, so
+    isinstance() and issubclass() hold within a clone as they do in a plain load.
+    Functions reachable only through other values (e.g. stored in a list) keep
+    the namespace they were defined in.
+  """
+
+  MUTABLE_TYPES = (dict, list, set, bytearray)
+
+  @classmethod
+  def from_schema(cls, schema=None):
+    environment = {}
+    Config.load_schema(environment, schema)
+    return cls(environment)
+
+  def __init__(self, environment, include_graph=None):
+    self._environment = dict(
+        (name, copy.deepcopy(value) if self.is_mutable(name, value) else value)
+        for name, value in environment.items() if name != 'include')
+    self._mutable = [name for name, value in self._environment.items()
+                     if self.is_mutable(name, value)]
+    classes = set()
+    for value in self._environment.values():
+      for klass in ((value,) if isinstance(value, type) else ()) + (type(value),):
+        classes.update(base for base in klass.__mro__ if self._is_config_class(base))
+    # Bases are rebuilt before the classes deriving from them.
+    self._classes = sorted(classes, key=lambda klass: len(klass.__mro__))
+    self._functions = [name for name, value in self._environment.items()
+                       if self._is_config_function(value)]
+    self._executed = frozenset(
+        path for path in (include_graph or {}) if path != ConfigContext.ROOT)
+
+  @classmethod
+  def is_mutable(cls, name, value):
+    """True for values that are copied into each clone rather than shared."""
+    if name.startswith('__'):
+      return False
+    return isinstance(value, cls.MUTABLE_TYPES) or cls._is_config_class(type(value))
+
+  @classmethod
+  def _is_config_function(cls, value):
+    """True for functions whose globals are a config namespace rather than a module's."""
+    if not isinstance(value, types.FunctionType):
+      return False
+    module = sys.modules.get(value.__module__)
+    return getattr(module, '__dict__', None) is not value.__globals__
+
+  @classmethod
+  def _unwrap(cls, attribute):
+    if isinstance(attribute, (staticmethod, classmethod)):
+      return [attribute.__func__]
+    elif isinstance(attribute, property):
+      return [attribute.fget, attribute.fset, attribute.fdel]
+    return [attribute]
+
+  @classmethod
+  def _is_config_class(cls, klass):
+    """True for classes with methods, of their own or inherited, defined by config files."""
+    return any(cls._is_config_function(function)
+               for base in klass.__mro__ for attribute in vars(base).values()
+               for function in cls._unwrap(attribute))
+
+  @classmethod
+  def _cell(cls, value):
+    return (lambda: value).__closure__[0]
+
+  @classmethod
+  def _rebind_cell(cls, cell, memo):
+    try:
+      contents = cell.cell_contents
+    except ValueError:
+      return cell
+    return cls._cell(memo[id(contents)]) if id(contents) in memo else cell
+
+  @classmethod
+  def _rebind_function(cls, function, namespace, memo):
+    # Methods using zero-argument super() close over their class in __class__.
+    closure = function.__closure__
+    if closure is not None:
+      closure = tuple(cls._rebind_cell(cell, memo) for cell in closure)
+    rebound = types.FunctionType(function.__code__, namespace, function.__name__,
+                                 function.__defaults__, closure)
+    rebound.__kwdefaults__ = function.__kwdefaults__
+    rebound.__dict__.update(function.__dict__)
+    rebound.__qualname__ = function.__qualname__
+    rebound.__annotations__ = function.__annotations__
+    rebound.__module__ = function.__module__
+    return rebound
+
+  @classmethod
+  def _rebind_class(cls, klass, namespace, memo):
+    """Rebuild klass on the rebuilt versions of its bases, registering it in memo."""
+    attributes = dict((name, memo.get(id(value), value)) for name, value in vars(klass).items()
+                      if name not in ('__dict__', '__weakref__'))
+    bases = tuple(memo.get(id(base), base) for base in klass.__bases__)
+    metaclass = memo.get(id(type(klass)), type(klass))
+    new_klass = memo[id(klass)] = metaclass(klass.__name__, bases, attributes)
+    new_klass.__qualname__ = klass.__qualname__
+
+    def rebind(function):
+      if function is None or not cls._is_config_function(function):
+        return function
+      return cls._rebind_function(function, namespace, memo)
+
+    for name, attribute in attributes.items():
+      if isinstance(attribute, (staticmethod, classmethod)):
+        setattr(new_klass, name, type(attribute)(rebind(attribute.__func__)))
+      elif isinstance(attribute, property):
+        setattr(new_klass, name, property(rebind(attribute.fget), rebind(attribute.fset),
+                                          rebind(attribute.fdel), attribute.__doc__))
+      elif isinstance(attribute, types.FunctionType):
+        setattr(new_klass, name, rebind(attribute))
+    return new_klass
+
+  @property
+  def executed(self):
+    """The resolved paths of the files already executed into this snapshot."""
+    return self._executed
+
+  def clone(self):
+    """Return a fresh environment populated from this snapshot."""
+    environment = self._environment.copy()
+    # Maps the ids of the snapshot's classes and functions to their rebuilt versions,
+    # which deepcopy() then substitutes for them within copied values.
+    memo = {}
+    for klass in self._classes:
+      self._rebind_class(klass, environment, memo)
+    for name in self._functions:
+      function = environment[name]
+      if id(function) not in memo:
+        memo[id(function)] = self._rebind_function(function, environment, memo)
+    for name, value in environment.items():
+      if id(value) in memo:
+        environment[name] = memo[id(value)]
+    for name in self._mutable:
+      environment[name] = copy.deepcopy(environment[name], memo)
+    return environment
+
+
 class Config(object):
   class Error(Exception): pass
   class InvalidConfigError(Error): pass
@@ -166,21 +493,45 @@ class Config(object):
 
   @classmethod
   def load_schema(cls, environment, schema=None):
-    exec_function(
-        compile(schema or cls.DEFAULT_SCHEMA, "<exec_function>", "exec"), environment)
-
-  def __init__(self, loadable, schema=None):
-    self._environment = {}
+    exec_function(compile_schema(schema or cls.DEFAULT_SCHEMA), environment)
+
+  def __init__(self, loadable, schema=None, code_cache=None, dedupe_includes=True, base=None,
+               track_definitions=False):
+    """
+      :param loadable: A filename, package resource, file-like object or loadables map.
+      :param schema: Source executed into the environment prior to loading.
+      :param code_cache: An optional CodeCache used to skip recompiling unchanged files.
+      :param dedupe_includes: If True, each resolved file is executed at most once per load
+        and subsequent include()s of it are no-ops.
+      :param base: An optional ConfigSnapshot to start from instead of an empty environment.
+        Files already executed into the snapshot are not executed again when
+        dedupe_includes is set.
+      :param track_definitions: If True, record the names each file defines and rebinds in
+        its IncludeNode, at the cost of scanning the environment after every file.
+    """
     self._loadables = {}
-    self.load_schema(self._environment, schema)
+    if base is None:
+      self._environment = {}
+      self.load_schema(self._environment, schema)
+    else:
+      self._environment = base.clone()
+      if schema is not None:
+        self.load_schema(self._environment, schema)
     root_executor, initial_config = self.choose_executor(loadable)
-    context = ConfigContext(self._environment, self._loadables)
+    context = ConfigContext(self._environment, self._loadables, code_cache=code_cache,
+        dedupe=dedupe_includes, executed=base.executed if base is not None else (),
+        track_definitions=track_definitions)
+    self._include_graph = context.include_graph
     self._environment.update(include=lambda fn: root_executor(fn, context))
     try:
       root_executor(initial_config, context)
     except (SyntaxError, ValueError) as e:
       raise self.InvalidConfigError(str(e))
 
+  def snapshot(self):
+    """Capture the loaded environment as a ConfigSnapshot for use as a base."""
+    return ConfigSnapshot(self._environment, self._include_graph)
+
   @property
   def loadables(self):
     return self._loadables
@@ -188,3 +539,11 @@ class Config(object):
   @property
   def environment(self):
     return self._environment
+
+  @property
+  def include_graph(self):
+    """
+      The include DAG of this load: a map from resolved path to IncludeNode.  The
+      node for ConfigContext.ROOT includes the initial loadable.
+    """
+    return self._include_graph
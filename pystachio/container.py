@@ -3,7 +3,7 @@ from collections.abc import Iterable, Mapping, Sequence
 from inspect import isclass
 
 from .base import Object
-from .naming import Namable, frozendict
+from .naming import Namable, Ref, frozendict
 from .typing import Type, TypeCheck, TypeFactory, TypeMetaclass
 
 
@@ -65,8 +65,11 @@ class ListContainer(Object, Namable, Type):
       return item in si.get()
 
   def __eq__(self, other):
+    if self is other: return True
     if not isinstance(other, ListContainer): return False
     if self.TYPE.serialize_type() != other.TYPE.serialize_type(): return False
+    if self.is_literal() and other.is_literal():
+      return self._values == other._values
     si, _ = self.interpolate()
     oi, _ = other.interpolate()
     return si._values == oi._values
@@ -82,17 +85,64 @@ class ListContainer(Object, Namable, Type):
       return value if isinstance(value, self.TYPE) else self.TYPE(value)
     return tuple([coerced(v) for v in values])
 
-  def check(self):
-    assert ListContainer.isiterable(self._values)
-    scopes = self.scopes()
+  def _scoped_children(self, scopes):
+    """The elements, in order."""
+    scopes = self._scopes + scopes
     for element in self._values:
-      assert isinstance(element, self.TYPE)
-      typecheck = element.in_scope(*scopes).check()
+      yield element, scopes
+
+  def _interpolate_and_check(self, scopes):
+    return self._join_interpolate_and_check(child._interpolate_and_check(child_scopes)
+        for child, child_scopes in self._scoped_children(scopes))
+
+  def _join_interpolate_and_check(self, results):
+    type_check, unbound, values = None, set(), []
+    for einterp, eunbound, echeck in results:
+      if type_check is None and not echeck.ok():
+        type_check = TypeCheck.failure("Element in %s failed check: %s" % (self.__class__.__name__,
+          echeck.message()))
+      if einterp is None:
+        values = None
+        if type_check is not None:
+          break
+      elif values is not None:
+        values.append(einterp)
+        unbound.update(eunbound)
+    if values is None:
+      return None, (), type_check
+    interpolated = self.__class__.__new__(self.__class__)
+    interpolated._values, interpolated._scopes, interpolated._memo = tuple(values), (), None
+    return interpolated, unbound, type_check or TypeCheck.success()
+
+  def _uncached_check(self, scopes):
+    return self._join_check(child._check(child_scopes)
+        for child, child_scopes in self._scoped_children(scopes))
+
+  def _join_check(self, checks):
+    for typecheck in checks:
       if not typecheck.ok():
         return TypeCheck.failure("Element in %s failed check: %s" % (self.__class__.__name__,
           typecheck.message()))
     return TypeCheck.success()
 
+  def _check_all(self, scopes, path, errors, max_errors):
+    scopes = self._scopes + scopes
+    for index, element in enumerate(self._values):
+      if max_errors is not None and len(errors) >= max_errors:
+        return
+      element._check_all(scopes, path + (Ref.Index(str(index)),), errors, max_errors)
+
+  def _is_literal(self):
+    return all(element.is_literal() for element in self._values)
+
+  def _iter_free_refs(self, scopes):
+    if self.is_literal():
+      return
+    scopes = self._scopes + scopes
+    for element in self._values:
+      for ref in element._iter_free_refs(scopes):
+        yield ref
+
   def interpolate(self):
     unbound = set()
     interpolated = []
@@ -237,21 +287,63 @@ class MapContainer(Object, Namable, Type):
       ', '.join('%s => %s' % (key, val) for key, val in si._map))
 
   def __eq__(self, other):
+    if self is other: return True
     if not isinstance(other, MapContainer): return False
     if self.KEYTYPE.serialize_type() != other.KEYTYPE.serialize_type(): return False
     if self.VALUETYPE.serialize_type() != other.VALUETYPE.serialize_type(): return False
+    if self.is_literal() and other.is_literal():
+      return self._map == other._map
     si, _ = self.interpolate()
     oi, _ = other.interpolate()
     return si._map == oi._map
 
-  def check(self):
-    assert isinstance(self._map, tuple)
-    scopes = self.scopes()
+  def _scoped_children(self, scopes):
+    """Each key followed by its value, in order."""
+    scopes = self._scopes + scopes
+    for key, value in self._map:
+      yield key, scopes
+      yield value, scopes
+
+  def _interpolate_and_check(self, scopes):
+    return self._join_interpolate_and_check(child._interpolate_and_check(child_scopes)
+        for child, child_scopes in self._scoped_children(scopes))
+
+  def _join_interpolate_and_check(self, results):
+    results = iter(results)
+    type_check, unbound, pairs = None, set(), []
+    for key, value in self._map:
+      kinterp, kunbound, keycheck = next(results)
+      vinterp, vunbound, valuecheck = next(results)
+      if type_check is None:
+        if not keycheck.ok():
+          type_check = TypeCheck.failure("%s key %s failed check: %s" % (self.__class__.__name__,
+            key, keycheck.message()))
+        elif not valuecheck.ok():
+          type_check = TypeCheck.failure("%s[%s] value %s failed check: %s" % (
+            self.__class__.__name__, key, value, valuecheck.message()))
+      if kinterp is None or vinterp is None:
+        pairs = None
+        if type_check is not None:
+          break
+      elif pairs is not None:
+        pairs.append((kinterp, vinterp))
+        unbound.update(kunbound)
+        unbound.update(vunbound)
+    if pairs is None:
+      return None, (), type_check
+    interpolated = self.__class__.__new__(self.__class__)
+    interpolated._map, interpolated._scopes, interpolated._memo = tuple(pairs), (), None
+    return interpolated, unbound, type_check or TypeCheck.success()
+
+  def _uncached_check(self, scopes):
+    return self._join_check(child._check(child_scopes)
+        for child, child_scopes in self._scoped_children(scopes))
+
+  def _join_check(self, checks):
+    checks = iter(checks)
     for key, value in self._map:
-      assert isinstance(key, self.KEYTYPE)
-      assert isinstance(value, self.VALUETYPE)
-      keycheck = key.in_scope(*scopes).check()
-      valuecheck = value.in_scope(*scopes).check()
+      keycheck = next(checks)
+      valuecheck = next(checks)
       if not keycheck.ok():
         return TypeCheck.failure("%s key %s failed check: %s" % (self.__class__.__name__,
           key, keycheck.message()))
@@ -260,6 +352,31 @@ class MapContainer(Object, Namable, Type):
           key, value, valuecheck.message()))
     return TypeCheck.success()
 
+  def _check_all(self, scopes, path, errors, max_errors):
+    scopes = self._scopes + scopes
+    for key, value in self._map:
+      if max_errors is not None and len(errors) >= max_errors:
+        return
+      kinterp, _, keycheck = key._interpolate_and_check(scopes)
+      index = Ref.Index(str((key if kinterp is None else kinterp).get()))
+      if not keycheck.ok():
+        errors.append((path + (index,), "%s key %s failed check: %s" % (self.__class__.__name__,
+          index.value, keycheck.message())))
+      value._check_all(scopes, path + (index,), errors, max_errors)
+
+  def _is_literal(self):
+    return all(key.is_literal() and value.is_literal() for key, value in self._map)
+
+  def _iter_free_refs(self, scopes):
+    if self.is_literal():
+      return
+    scopes = self._scopes + scopes
+    for key, value in self._map:
+      for ref in key._iter_free_refs(scopes):
+        yield ref
+      for ref in value._iter_free_refs(scopes):
+        yield ref
+
   def interpolate(self):
     unbound = set()
     interpolated = []
@@ -0,0 +1,233 @@
+"""
+  A local config evaluation daemon.
+
+  The daemon keeps the schema and prelude environment warm in a long-running
+  process and evaluates configs on behalf of thin clients over a Unix socket,
+  forking a child per request so that configs cannot affect each other or the
+  daemon.  The wire protocol is one JSON object per line in each direction.
+
+    python -m pystachio.daemon serve /tmp/pystachio.sock --prelude prelude.config
+    python -m pystachio.daemon render /tmp/pystachio.sock job.config jobs profile.version=3
+"""
+
+import argparse
+import collections
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+
+from .config import Config, ConfigSnapshot
+
+
+class ConfigRequestHandler(socketserver.StreamRequestHandler):
+  def handle(self):
+    start = time.time()
+    ok = False
+    try:
+      request = json.loads(self.rfile.readline().decode('utf-8'))
+      if request.get('command') == 'stats':
+        response = {'stats': self.server.stats()}
+      else:
+        response = self.server.render(request)
+      ok = True
+    except Exception as e:
+      response = {'error': '%s: %s' % (e.__class__.__name__, e)}
+    payload = json.dumps(response).encode('utf-8') + b'\n'
+    # Record before responding so that the client's next request observes it.
+    self.server.record(time.time() - start, ok)
+    self.wfile.write(payload)
+    self.wfile.flush()
+
+
+class ConfigServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+  """
+    Evaluates Configs on top of a warm ConfigSnapshot, forking per request.
+
+    Children report each request's latency back to the daemon over a pipe, which
+    the daemon drains before forking, so stats() reflects every completed request.
+    Stats requests already received in full when accepted are answered by the
+    daemon itself, without forking, since only the daemon sees every child's
+    reports.  Children never drain the pipe, so a stats request answered by a
+    child (because it arrived late) reflects the requests completed before it was
+    forked.
+  """
+
+  MAX_SAMPLES = 10000
+  PEEK_SIZE = 4096
+
+  def __init__(self, socket_path, base=None, code_cache=None):
+    self.base = base if base is not None else ConfigSnapshot.from_schema()
+    self.code_cache = code_cache
+    self._latencies = collections.deque(maxlen=self.MAX_SAMPLES)
+    self._requests = 0
+    self._errors = 0
+    self._stats_read, self._stats_write = os.pipe()
+    os.set_blocking(self._stats_read, False)
+    self._stats_buffer = b''
+    self._pid = os.getpid()
+    socketserver.UnixStreamServer.__init__(self, socket_path, ConfigRequestHandler)
+
+  def render(self, request):
+    config = Config(request['loadable'], base=self.base, code_cache=self.code_cache)
+    obj = config.environment[request['name']].bind(request.get('bindings') or {})
+    interpolated, unbound = obj.interpolate()
+    if hasattr(interpolated, 'json_dumps'):
+      result = interpolated.json_dumps()
+    else:
+      result = json.dumps(interpolated.get())
+    return {'result': result, 'unbound': [ref.address() for ref in unbound]}
+
+  def record(self, latency, ok):
+    os.write(self._stats_write, ('%f %d\n' % (latency, ok)).encode('ascii'))
+
+  def _drain_stats(self):
+    if os.getpid() != self._pid:
+      # Only the daemon drains the pipe; a child would consume its siblings' reports.
+      return
+    while True:
+      try:
+        chunk = os.read(self._stats_read, 65536)
+      except BlockingIOError:
+        break
+      if not chunk:
+        break
+      self._stats_buffer += chunk
+    *lines, self._stats_buffer = self._stats_buffer.split(b'\n')
+    for line in lines:
+      latency, ok = line.split()
+      self._latencies.append(float(latency))
+      self._requests += 1
+      self._errors += 0 if int(ok) else 1
+
+  def stats(self):
+    """Request counts and latency percentiles, in milliseconds, of completed requests."""
+    self._drain_stats()
+    latencies = sorted(self._latencies)
+    def percentile(p):
+      return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    stats = {'requests': self._requests, 'errors': self._errors}
+    if latencies:
+      stats.update(
+        mean_ms=sum(latencies) * 1000 / len(latencies),
+        p50_ms=percentile(0.50),
+        p99_ms=percentile(0.99),
+        max_ms=latencies[-1] * 1000,
+      )
+    return stats
+
+  @classmethod
+  def _peek(cls, request):
+    """The bytes the client has sent so far, without consuming them or waiting for more."""
+    try:
+      return request.recv(cls.PEEK_SIZE, socket.MSG_PEEK | socket.MSG_DONTWAIT)
+    except (BlockingIOError, InterruptedError):
+      return b''
+
+  @classmethod
+  def _is_stats_request(cls, data):
+    line, newline, _ = data.partition(b'\n')
+    if not newline:
+      return False
+    try:
+      request = json.loads(line.decode('utf-8'))
+    except ValueError:
+      return False
+    return isinstance(request, dict) and request.get('command') == 'stats'
+
+  def process_request(self, request, client_address):
+    self._drain_stats()
+    if self._is_stats_request(self._peek(request)):
+      try:
+        self.finish_request(request, client_address)
+      except Exception:
+        self.handle_error(request, client_address)
+      finally:
+        self.shutdown_request(request)
+    else:
+      socketserver.ForkingMixIn.process_request(self, request, client_address)
+
+  def service_actions(self):
+    socketserver.ForkingMixIn.service_actions(self)
+    self._drain_stats()
+
+  def server_close(self):
+    socketserver.UnixStreamServer.server_close(self)
+    os.close(self._stats_read)
+    os.close(self._stats_write)
+
+
+class ConfigClient(object):
+  """A thin client for ConfigServer."""
+
+  class Error(Exception): pass
+
+  def __init__(self, socket_path):
+    self._socket_path = socket_path
+
+  def _request(self, request):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+      sock.connect(self._socket_path)
+      sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+      with sock.makefile('rb') as fp:
+        response = json.loads(fp.readline().decode('utf-8'))
+    finally:
+      sock.close()
+    if 'error' in response:
+      raise self.Error(response['error'])
+    return response
+
+  def render(self, loadable, name, bindings=None):
+    """
+      Evaluate `loadable` (a filename or loadables map) in the daemon and return
+      the JSON serialization of the top-level `name` interpolated with `bindings`.
+    """
+    if isinstance(loadable, str):
+      loadable = os.path.abspath(loadable)
+    return self._request({'loadable': loadable, 'name': name, 'bindings': bindings})['result']
+
+  def stats(self):
+    return self._request({'command': 'stats'})['stats']
+
+
+def main(args=None):
+  parser = argparse.ArgumentParser(prog='python -m pystachio.daemon')
+  subparsers = parser.add_subparsers(dest='command')
+  serve = subparsers.add_parser('serve', help='Run the daemon.')
+  serve.add_argument('socket')
+  serve.add_argument('--prelude', default=None, help='Config file to keep loaded.')
+  render = subparsers.add_parser('render', help='Render a config through the daemon.')
+  render.add_argument('socket')
+  render.add_argument('loadable')
+  render.add_argument('name')
+  render.add_argument('bindings', nargs='*', help='Bindings of the form ref=value.')
+  stats = subparsers.add_parser('stats', help='Print daemon latency stats.')
+  stats.add_argument('socket')
+  options = parser.parse_args(args)
+
+  if options.command == 'serve':
+    # Absolute, so that it matches the paths of clients' includes of the prelude.
+    base = Config(os.path.abspath(options.prelude)).snapshot() if options.prelude else None
+    server = ConfigServer(options.socket, base=base)
+    try:
+      server.serve_forever()
+    finally:
+      server.server_close()
+      os.unlink(options.socket)
+  elif options.command == 'render':
+    client = ConfigClient(options.socket)
+    bindings = dict(binding.split('=', 1) for binding in options.bindings)
+    print(client.render(options.loadable, options.name, bindings))
+  elif options.command == 'stats':
+    print(json.dumps(ConfigClient(options.socket).stats(), indent=2, sort_keys=True))
+  else:
+    parser.print_help()
+    return 1
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+  Schema-compiled decoders from plain JSON data to Pystachio objects.
+
+  A decoder is compiled once per type and builds the typed object tree in a
+  single pass over the parsed JSON, dropping keys the schema does not know about
+  (or rejecting them, if strict) as it goes.  The objects it builds are the same
+  as those the type's constructor would build from the same data.
+
+  Trusted decoders additionally skip the input checks the constructors make
+  (Mappings where Structs are expected, Enum membership, pass-through of values
+  that are already Objects), for data known to come from json_dumps().
+
+  Decoding a large document allocates millions of objects, none of them part of
+  a reference cycle, so cyclic garbage collection is paused while it runs.
+"""
+
+import collections
+import gc
+import itertools
+import json
+import pickle
+from collections.abc import Mapping
+from contextlib import contextmanager
+from functools import lru_cache
+
+from .base import Object
+from .basic import SimpleObject
+from .composite import Empty, IsNotMappingError, Structural
+from .container import ListContainer, MapContainer
+from .naming import frozendict
+from .typing import TypeFactory
+
+
+def _struct_decoder(cls, strict, trusted):
+  new = cls.__new__
+  defaults = dict((attr, sig.default) for attr, sig in cls.TYPEMAP.items())
+  fields = dict((attr, compile_decoder(sig.klazz, strict, trusted))
+                for attr, sig in cls.TYPEMAP.items())
+
+  def decode_schema_data(data):
+    schema_data = frozendict(defaults)
+    for attr, value in data.items():
+      field = fields.get(attr)
+      if field is None:
+        if strict:
+          raise AttributeError('Unknown schema attribute %s' % attr)
+        continue
+      schema_data[attr] = Empty if value is Empty else field(value)
+    obj = new(cls)
+    obj._schema_data, obj._scopes, obj._memo = schema_data, (), None
+    return obj
+
+  if trusted:
+    return decode_schema_data
+
+  def decode(data):
+    if isinstance(data, Object):
+      return data if isinstance(data, cls) else cls(data)
+    if not isinstance(data, Mapping):
+      raise IsNotMappingError(data)
+    return decode_schema_data(data)
+
+  return decode
+
+
+def _list_decoder(cls, strict, trusted):
+  new = cls.__new__
+  element = compile_decoder(cls.TYPE, strict, trusted)
+
+  def decode_values(values):
+    obj = new(cls)
+    obj._values, obj._scopes, obj._memo = tuple([element(value) for value in values]), (), None
+    return obj
+
+  if trusted:
+    return decode_values
+
+  def decode(values):
+    if isinstance(values, Object):
+      return values if isinstance(values, cls) else cls(values)
+    if not ListContainer.isiterable(values):
+      raise ValueError('ListContainer expects an iterable, got %s' % repr(values))
+    return decode_values(values)
+
+  return decode
+
+
+def _map_decoder(cls, strict, trusted):
+  new = cls.__new__
+  key_decoder = compile_decoder(cls.KEYTYPE, strict, trusted)
+  value_decoder = compile_decoder(cls.VALUETYPE, strict, trusted)
+
+  def decode_map(values):
+    obj = new(cls)
+    obj._map = tuple([(key_decoder(key), value_decoder(value)) for key, value in values.items()])
+    obj._scopes, obj._memo = (), None
+    return obj
+
+  if trusted:
+    return decode_map
+
+  def decode(values):
+    if isinstance(values, Object) or not isinstance(values, Mapping):
+      return values if isinstance(values, cls) else cls(values)
+    return decode_map(values)
+
+  return decode
+
+
+def _simple_decoder(cls, strict, trusted):
+  if not trusted:
+    return _leaf_decoder(cls, strict, trusted)
+
+  # Bypasses __init__, which for Enums interpolates the value to check it.
+  new = cls.__new__
+
+  def decode(value):
+    obj = new(cls)
+    obj._value, obj._scopes, obj._memo = value, (), None
+    return obj
+
+  return decode
+
+
+def _leaf_decoder(cls, strict, trusted):
+  def decode(value):
+    if isinstance(value, Object) and isinstance(value, cls):
+      return value
+    return cls(value)
+
+  return decode
+
+
+@lru_cache(maxsize=None)
+def compile_decoder(cls, strict=False, trusted=False):
+  """
+    Compile a function that converts plain JSON data (dicts, lists, strings and
+    numbers) into an instance of the Pystachio type cls.
+
+    If strict, keys unknown to a Struct's schema raise AttributeError rather than
+    being dropped.  If trusted, the data is assumed to be well-formed, e.g. the
+    output of json_dumps() of the same type, and is not checked as it is decoded.
+  """
+  if issubclass(cls, Structural):
+    return _struct_decoder(cls, strict, trusted)
+  elif issubclass(cls, ListContainer):
+    return _list_decoder(cls, strict, trusted)
+  elif issubclass(cls, MapContainer):
+    return _map_decoder(cls, strict, trusted)
+  elif issubclass(cls, SimpleObject):
+    return _simple_decoder(cls, strict, trusted)
+  return _leaf_decoder(cls, strict, trusted)
+
+
+@contextmanager
+def gc_paused():
+  """Pause cyclic garbage collection while building large acyclic object trees."""
+  enabled = gc.isenabled()
+  gc.disable()
+  try:
+    yield
+  finally:
+    if enabled:
+      gc.enable()
+
+
+def load(cls, fp, strict=False, trusted=False):
+  """Decode an instance of cls from the JSON document in the file object fp."""
+  with gc_paused():
+    return compile_decoder(cls, strict, trusted)(json.load(fp))
+
+
+def loads(cls, json_string, strict=False, trusted=False):
+  """Decode an instance of cls from the JSON document json_string."""
+  with gc_paused():
+    return compile_decoder(cls, strict, trusted)(json.loads(json_string))
+
+
+# The errors decoding a malformed record raises.
+RECORD_ERRORS = (AttributeError, TypeError, ValueError)
+
+
+def decode_records(cls, records, strict=True, processes=None, chunksize=1024):
+  """
+    Decode each of records (Mappings, or instances of cls) into an instance of
+    cls, as cls(record) would.  A record that fails to decode does not abort the
+    batch: returns the list of decoded instances, in input order, and a list of
+    (index, exception) for the records that failed.
+
+    If processes is given, records are validated in a pool of that many
+    processes, chunksize at a time, and only the valid ones are built, without
+    re-checking, in this process.  Records other than instances of cls must
+    then be picklable plain data.
+  """
+  if processes:
+    return _decode_records_pooled(cls, records, strict, processes, chunksize)
+  decoder = compile_decoder(cls, strict)
+  instances, errors = [], []
+  with gc_paused():
+    for index, record in enumerate(records):
+      try:
+        instances.append(decoder(record))
+      except RECORD_ERRORS as e:
+        errors.append((index, e))
+  return instances, errors
+
+
+_VALIDATOR = None
+
+
+def _init_validator(type_tuple, strict):
+  global _VALIDATOR
+  _VALIDATOR = compile_decoder(TypeFactory.new({}, *type_tuple), strict)
+
+
+def _validate_chunk(chunk):
+  """The (index, exception) of the records in chunk that fail to decode."""
+  errors = []
+  for index, record in chunk:
+    try:
+      _VALIDATOR(record)
+    except RECORD_ERRORS as e:
+      try:
+        pickle.loads(pickle.dumps(e))
+      except Exception:
+        e = ValueError(str(e))
+      errors.append((index, e))
+  return errors
+
+
+def _decode_records_pooled(cls, records, strict, processes, chunksize):
+  # Imported here so that serial decoding does not pay for multiprocessing.
+  from concurrent.futures import ProcessPoolExecutor
+
+  # Objects do not pickle, since their classes are built dynamically, so they
+  # are passed through here rather than validated by the workers.
+  decoder = compile_decoder(cls, strict)
+  trusted_decoder = compile_decoder(cls, strict, trusted=True)
+  instances, errors = [], []
+
+  def build(chunk, chunk_errors):
+    failed = dict(chunk_errors)
+    for index, record in chunk:
+      if index in failed:
+        errors.append((index, failed[index]))
+        continue
+      try:
+        instances.append(decoder(record) if isinstance(record, Object) else trusted_decoder(record))
+      except RECORD_ERRORS as e:
+        errors.append((index, e))
+
+  numbered = enumerate(records)
+  chunks = iter(lambda: list(itertools.islice(numbered, chunksize)), [])
+  with ProcessPoolExecutor(max_workers=processes, initializer=_init_validator,
+                           initargs=(cls.serialize_type(), strict)) as pool, gc_paused():
+    pending = collections.deque()
+    for chunk in chunks:
+      plain = [(index, record) for index, record in chunk if not isinstance(record, Object)]
+      pending.append((chunk, pool.submit(_validate_chunk, plain)))
+      if len(pending) >= 2 * processes:
+        chunk, future = pending.popleft()
+        build(chunk, future.result())
+    while pending:
+      chunk, future = pending.popleft()
+      build(chunk, future.result())
+  return instances, errors
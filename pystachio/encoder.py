@@ -0,0 +1,135 @@
+"""
+  Direct JSON serialization of Pystachio objects.
+
+  iterencode(obj) yields the JSON text of obj.interpolate()[0].get() piece by
+  piece, as json.JSONEncoder.iterencode does, but walks obj itself rather than
+  an interpolated copy of it: literal subtrees are written straight from their
+  values, and only leaves containing templates are interpolated (within the
+  scopes of their parents).  Output is identical to json.dumps(), with its
+  default separators and ensure_ascii.
+"""
+
+import json
+from json.encoder import encode_basestring_ascii
+
+from .basic import SimpleObject
+from .composite import Empty, Structural
+from .container import ListContainer, MapContainer
+
+_ENCODER = json.JSONEncoder()
+_INFINITY = float('inf')
+
+
+def _scalar(value):
+  """The JSON text of a plain value, as json.dumps() would write it."""
+  if isinstance(value, str):
+    return encode_basestring_ascii(value)
+  elif value is None:
+    return 'null'
+  elif value is True:
+    return 'true'
+  elif value is False:
+    return 'false'
+  elif isinstance(value, int):
+    return int.__repr__(value)
+  elif isinstance(value, float):
+    if value != value:
+      return 'NaN'
+    elif value == _INFINITY:
+      return 'Infinity'
+    elif value == -_INFINITY:
+      return '-Infinity'
+    return float.__repr__(value)
+  return _ENCODER.encode(value)
+
+
+def _key(value):
+  """The JSON text of a plain value used as an object key."""
+  if isinstance(value, str):
+    return encode_basestring_ascii(value)
+  elif value is None or isinstance(value, (int, float)):
+    return encode_basestring_ascii(_scalar(value))
+  raise TypeError('keys must be str, int, float, bool or None, not %s' % (
+      value.__class__.__name__))
+
+
+def _leaf_value(obj):
+  """The value of the scoped SimpleObject obj once interpolated."""
+  if obj.is_literal():
+    return obj.coerce(obj._value)
+  interpolated, _ = obj.interpolate()
+  return interpolated._value
+
+
+def _scoped(parent, scopes, child):
+  """child ready to be serialized: literal children need no scopes."""
+  if child.is_literal():
+    return child, scopes
+  if scopes is None:
+    scopes = parent.scopes()
+  return child.in_scope(*scopes), scopes
+
+
+def _iterencode(obj):
+  if isinstance(obj, SimpleObject):
+    yield _scalar(_leaf_value(obj))
+  elif isinstance(obj, Structural):
+    scopes, separator = None, '{'
+    for key, value in obj._schema_data.items():
+      if value is Empty:
+        continue
+      yield '%s%s: ' % (separator, encode_basestring_ascii(key))
+      separator = ', '
+      value, scopes = _scoped(obj, scopes, value)
+      yield from _iterencode(value)
+    yield '{}' if separator == '{' else '}'
+  elif isinstance(obj, ListContainer):
+    scopes, separator = None, '['
+    for element in obj._values:
+      yield separator
+      separator = ', '
+      element, scopes = _scoped(obj, scopes, element)
+      yield from _iterencode(element)
+    yield '[]' if separator == '[' else ']'
+  elif isinstance(obj, MapContainer):
+    # As with get(), keys that are equal once interpolated collapse into one.
+    scopes, items = None, {}
+    for key, value in obj._map:
+      key, scopes = _scoped(obj, scopes, key)
+      value, scopes = _scoped(obj, scopes, value)
+      if isinstance(key, SimpleObject):
+        key = _leaf_value(key)
+      else:
+        key = key.interpolate()[0].get()
+      items[key] = value
+    separator = '{'
+    for key, value in items.items():
+      yield '%s%s: ' % (separator, _key(key))
+      separator = ', '
+      yield from _iterencode(value)
+    yield '{}' if separator == '{' else '}'
+  else:
+    interpolated, _ = obj.interpolate()
+    yield from _ENCODER.iterencode(interpolated.get())
+
+
+def iterencode(obj):
+  """Yield the JSON text of obj.interpolate()[0].get() in pieces."""
+  return _iterencode(obj)
+
+
+def dumps(obj):
+  """The JSON text of obj.interpolate()[0].get()."""
+  return ''.join(_iterencode(obj))
+
+
+def dump(obj, fp, chunk_size=1024):
+  """Write the JSON text of obj.interpolate()[0].get() to fp, chunk_size pieces at a time."""
+  chunk = []
+  for piece in _iterencode(obj):
+    chunk.append(piece)
+    if len(chunk) >= chunk_size:
+      fp.write(''.join(chunk))
+      chunk = []
+  if chunk:
+    fp.write(''.join(chunk))
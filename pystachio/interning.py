@@ -0,0 +1,112 @@
+"""
+  Hash-consing of literal subtrees.
+
+  Rendered configurations repeat themselves: a fleet of jobs holds thousands of
+  equal Resources and command line subtrees, each a separate graph of objects.
+  An InternTable replaces each literal subtree with a single canonical instance
+  of it, shared by every object interned with the same table:
+
+    >>> table = InternTable()
+    >>> jobs = [table.intern(job) for job in jobs]
+
+  Subtrees are identified by a content fingerprint built bottom-up from the
+  identities of their canonical children, so a subtree is fingerprinted in time
+  proportional to its own fields rather than to its size.  Canonical subtrees are
+  in interpolated form (leaves hold coerced values), and interning never changes
+  what an object interpolates to.  Subtrees containing templates are rebuilt
+  around their interned children but are not themselves shared, since what they
+  interpolate to depends on their scopes.
+
+  Objects are immutable, so shared subtrees are safe to share, and comparing two
+  objects that share a subtree compares it by identity.
+"""
+
+from .base import Object
+from .basic import SimpleObject
+from .choice import ChoiceContainer
+from .composite import Empty, Structural
+from .container import ListContainer, MapContainer
+from .naming import frozendict
+
+
+class InternTable(object):
+  """A table of canonical literal subtrees, keyed by their content fingerprints."""
+
+  def __init__(self):
+    self._canonical = {}
+
+  def __len__(self):
+    return len(self._canonical)
+
+  def intern(self, obj):
+    """obj, with each of its literal subtrees replaced by its canonical instance."""
+    if obj.is_literal():
+      return self._intern_literal(obj)
+    return self._rebuild(obj)
+
+  def _canonicalize(self, key, build):
+    try:
+      return self._canonical[key]
+    except KeyError:
+      canonical = self._canonical[key] = build()
+      return canonical
+
+  @classmethod
+  def _new(cls, obj, slot, value):
+    new = obj.__class__.__new__(obj.__class__)
+    setattr(new, slot, value)
+    new._scopes, new._memo = (), None
+    return new
+
+  def _intern_literal(self, obj):
+    if isinstance(obj, SimpleObject):
+      value = obj.coerce(obj._value)
+      # -0.0 == 0.0, but the two are written differently.
+      fingerprint = value.hex() if isinstance(value, float) else value
+      return self._canonicalize((obj.__class__, fingerprint),
+                                lambda: self._new(obj, '_value', value))
+    elif isinstance(obj, Structural):
+      schema_data = frozendict((name, value if value is Empty else self._intern_literal(value))
+                               for name, value in obj._schema_data.items())
+      key = (obj.__class__,) + tuple(id(value) for value in schema_data.values())
+      return self._canonicalize(key, lambda: self._new(obj, '_schema_data', schema_data))
+    elif isinstance(obj, ListContainer):
+      values = tuple(self._intern_literal(value) for value in obj._values)
+      key = (obj.__class__,) + tuple(id(value) for value in values)
+      return self._canonicalize(key, lambda: self._new(obj, '_values', values))
+    elif isinstance(obj, MapContainer):
+      pairs = tuple((self._intern_literal(key), self._intern_literal(value))
+                    for key, value in obj._map)
+      key = (obj.__class__,) + tuple((id(k), id(v)) for k, v in pairs)
+      return self._canonicalize(key, lambda: self._new(obj, '_map', pairs))
+    elif isinstance(obj, ChoiceContainer):
+      value = obj._value
+      if isinstance(value, Object):
+        value = self._intern_literal(value)
+        key = (obj.__class__, id(value))
+      else:
+        key = (obj.__class__, type(value), value)
+      try:
+        return self._canonicalize(key, lambda: self._new(obj, '_value', value))
+      except TypeError:
+        # Unhashable raw values cannot be fingerprinted.
+        return obj
+    return obj
+
+  def _rebuild(self, obj):
+    """A copy of the non-literal obj with its literal subtrees interned."""
+    if isinstance(obj, Structural):
+      slot = '_schema_data'
+      value = frozendict((name, value if value is Empty else self.intern(value))
+                         for name, value in obj._schema_data.items())
+    elif isinstance(obj, ListContainer):
+      slot = '_values'
+      value = tuple(self.intern(value) for value in obj._values)
+    elif isinstance(obj, MapContainer):
+      slot = '_map'
+      value = tuple((self.intern(key), self.intern(value)) for key, value in obj._map)
+    else:
+      return obj
+    new = self._new(obj, slot, value)
+    new._scopes = obj._scopes
+    return new
@@ -0,0 +1,110 @@
+"""
+  Streaming JSON Lines readers and writers for Struct collections.
+
+  Records are read and written one line at a time, so memory use is bounded by
+  the size of a record rather than of the stream.  Reading can be spread over a
+  pool of processes that parse and validate lines in chunks; records are still
+  yielded in input order, and only a bounded number of chunks is in flight.
+"""
+
+import collections
+import itertools
+import json
+
+from . import encoder
+from .decoder import RECORD_ERRORS, compile_decoder
+from .typing import TypeFactory
+
+
+class RecordError(ValueError):
+  """Raised when a JSON Lines record cannot be decoded or fails its check."""
+
+  def __init__(self, lineno, message):
+    ValueError.__init__(self, lineno, message)
+    self.lineno = lineno
+    self.message = message
+
+  def __str__(self):
+    return 'line %d: %s' % (self.lineno, self.message)
+
+
+def _decode(decoder, lineno, line, check):
+  """Returns the parsed record and the object decoded from it."""
+  try:
+    record = json.loads(line)
+    obj = decoder(record)
+  except RECORD_ERRORS as e:
+    raise RecordError(lineno, str(e))
+  if check:
+    type_check = obj.check()
+    if not type_check.ok():
+      raise RecordError(lineno, type_check.message())
+  return record, obj
+
+
+def _numbered_lines(fp):
+  for lineno, line in enumerate(fp, start=1):
+    if line.strip():
+      yield lineno, line
+
+
+_WORKER_STATE = None
+
+
+def _init_worker(type_tuple, strict, check):
+  global _WORKER_STATE
+  cls = TypeFactory.new({}, *type_tuple)
+  _WORKER_STATE = (compile_decoder(cls, strict), check)
+
+
+def _parse_chunk(chunk):
+  """Parse and validate a chunk of (lineno, line) in a worker, returning the raw records."""
+  decoder, check = _WORKER_STATE
+  return [_decode(decoder, lineno, line, check)[0] for lineno, line in chunk]
+
+
+def _iter_pooled(cls, numbered_lines, strict, check, processes, chunksize):
+  # Imported here so that serial readers do not pay for multiprocessing.
+  from concurrent.futures import ProcessPoolExecutor
+
+  # Workers have already validated the records, so the parent only builds them.
+  decoder = compile_decoder(cls, trusted=True)
+  chunks = iter(lambda: list(itertools.islice(numbered_lines, chunksize)), [])
+  with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                           initargs=(cls.serialize_type(), strict, check)) as pool:
+    pending = collections.deque()
+    for chunk in chunks:
+      pending.append(pool.submit(_parse_chunk, chunk))
+      if len(pending) >= 2 * processes:
+        for record in pending.popleft().result():
+          yield decoder(record)
+    while pending:
+      for record in pending.popleft().result():
+        yield decoder(record)
+
+
+def iter_jsonl(cls, fp, strict=False, trusted=False, check=False, processes=None, chunksize=256):
+  """
+    Yield an instance of cls for each non-blank line of the file object fp.
+
+    If check, records that do not typecheck raise RecordError.  If processes is
+    given, lines are parsed and validated in a pool of that many processes,
+    chunksize lines at a time.
+  """
+  numbered_lines = _numbered_lines(fp)
+  if processes:
+    return _iter_pooled(cls, numbered_lines, strict, check, processes, chunksize)
+  decoder = compile_decoder(cls, strict, trusted)
+  return (_decode(decoder, lineno, line, check)[1] for lineno, line in numbered_lines)
+
+
+def dump_jsonl(cls, iterable, fp):
+  """Write each object of iterable (instances of cls, or Mappings) to fp as a JSON line."""
+  count = 0
+  for obj in iterable:
+    if not isinstance(obj, cls):
+      obj = cls(obj)
+    fp.write(encoder.dumps(obj))
+    fp.write('\n')
+    count += 1
+  return count
@@ -1,6 +1,7 @@
 import copy
 import re
 
+from .base import Environment
 from .naming import Ref
 
 try:
@@ -63,8 +64,9 @@ class Matcher(object):
     return 'Match(%s)' % '+'.join(map(str, self._components))
 
   def match(self, pystachio_object):
-    _, refs = pystachio_object.interpolate()
-    for ref in refs:
+    # free_refs() is cached on the object, so matching an object again, with this or
+    # any other Matcher, does not walk it again.
+    for ref in pystachio_object.free_refs():
       args = []
       zips = list(zipl(self._components, ref.components()))
       for pattern, component in zips[:len(self._components)]:
@@ -80,9 +82,101 @@ class Matcher(object):
       components.append(component.__class__(match))
     return Ref(components)
 
+  def __bind(self, binder, pystachio_object, bindings, environments):
+    refs = []
+    for match in self.match(pystachio_object):
+      ref = self.__translate(match)
+      if ref not in bindings:
+        bindings[ref] = binder(*match)
+      refs.append(ref)
+    if not refs:
+      return pystachio_object
+    key = frozenset(refs)
+    if key not in environments:
+      environments[key] = Environment(dict((ref, bindings[ref]) for ref in refs))
+    return pystachio_object.bind(environments[key])
+
   def apply(self, binder, pystachio_object):
+    """
+      Bind binder(*match) to the Ref of every match in the object.  All matches are
+      bound at once, so the result is a single copy with a single new scope.
+    """
     if not callable(binder):
       raise TypeError('binder must be a callable')
-    for match in self.match(pystachio_object):
-      pystachio_object = pystachio_object.bind({self.__translate(match): binder(*match)})
-    return pystachio_object
+    return self.__bind(binder, pystachio_object, {}, {})
+
+  def apply_all(self, binder, pystachio_objects):
+    """
+      Apply the binder to each of a sequence of objects, returning a list.  The binder
+      is called once per distinct match across all of the objects, and its first
+      result for a Ref is reused for every object matching it.  Objects with the same
+      set of matches share the same bound Environment.
+    """
+    if not callable(binder):
+      raise TypeError('binder must be a callable')
+    bindings, environments = {}, {}
+    return [self.__bind(binder, pystachio_object, bindings, environments)
+            for pystachio_object in pystachio_objects]
+
+
+class MatcherSet(object):
+  """
+    A set of Matchers compiled into a trie of their components, so that every
+    Matcher can be applied to an object with a single interpolation and a single
+    walk over its unbound Refs.
+
+    Components with equal patterns are shared between Matchers, so each distinct
+    pattern is tested at most once per Ref component.
+  """
+
+  class _Node(object):
+    __slots__ = ('children', 'matchers')
+
+    def __init__(self):
+      self.children = {}
+      self.matchers = []
+
+  def __init__(self, matchers=()):
+    self._root = self._Node()
+    self._matchers = []
+    for matcher in matchers:
+      self.add(matcher)
+
+  def add(self, matcher):
+    node = self._root
+    for component in matcher._components:
+      key = (component.__class__, component.value.pattern)
+      if key not in node.children:
+        node.children[key] = (component.__class__, component.value, self._Node())
+      node = node.children[key][2]
+    node.matchers.append(matcher)
+    self._matchers.append(matcher)
+    return self
+
+  def __iter__(self):
+    return iter(self._matchers)
+
+  def __len__(self):
+    return len(self._matchers)
+
+  def _walk(self, node, components, args):
+    for matcher in node.matchers:
+      yield matcher, tuple(args)
+    if not components:
+      return
+    component = components[0]
+    for klazz, pattern, child in node.children.values():
+      if klazz == component.__class__ and pattern.match(component.value):
+        args.append(component.value)
+        for hit in self._walk(child, components[1:], args):
+          yield hit
+        args.pop()
+
+  def match(self, pystachio_object):
+    """
+      Yield a (matcher, match tuple) pair for every Matcher in the set and every
+      unbound Ref of the object it matches, in the same form as Matcher.match.
+    """
+    for ref in pystachio_object.free_refs():
+      for hit in self._walk(self._root, ref.components(), []):
+        yield hit
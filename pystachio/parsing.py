@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 
 from .naming import Namable, Ref
 
@@ -22,6 +23,17 @@ class MustacheParser(object):
 
   @classmethod
   def split(cls, string, keep_aliases=False):
+    return list(cls._split(string, keep_aliases))
+
+  @classmethod
+  @lru_cache(maxsize=10000)
+  def refs(cls, string):
+    """The Refs in a template, parsed once per distinct string."""
+    return tuple(split for split in cls._split(string, False) if isinstance(split, Ref))
+
+  @classmethod
+  @lru_cache(maxsize=10000)
+  def _split(cls, string, keep_aliases):
     splits = cls._MUSTACHE_RE.split(string)
     first_split = splits.pop(0)
     outsplits = [first_split] if first_split else []
@@ -38,7 +50,7 @@ class MustacheParser(object):
           k, splits[k]))
       if splits[k + 2]:
         outsplits.append(splits[k + 2])
-    return outsplits
+    return tuple(outsplits)
 
   @classmethod
   def join(cls, splits, *namables, found_refs = dict()):
@@ -0,0 +1,162 @@
+from .base import Object
+from .composite import Empty, Structural
+from .container import ListContainer, MapContainer
+from .naming import Namable
+from .parsing import MustacheParser
+
+
+class Reactive(object):
+  """
+    Repeatedly interpolate a template against bindings that change over time.
+
+    The first interpolation records, for every leaf of the template, the Refs its
+    value depends on: the Refs in its template and, transitively, the Refs in the
+    bound values those resolve to.  Subsequent interpolations with new bindings
+    re-resolve only the leaves depending on a Ref whose bound value changed and
+    rebuild only their ancestors; every other subtree of the previous result is
+    reused as-is.
+
+      >>> preview = Reactive(job)
+      >>> job1, unbound = preview.interpolate(profile = {'version': 1})
+      >>> job2, unbound = preview.interpolate(profile = {'version': 2})
+
+    The results are the same as job.bind(...).interpolate().
+  """
+
+  MISSING = object()
+
+  def __init__(self, template):
+    self._template = template
+    self._template_refs = dict(self._leaves(template, (), ()))
+    self._scopes = None
+    self._result = None
+    self._dependencies = {}
+    self._unbound = {}
+
+  @classmethod
+  def _leaves(cls, node, scopes, path):
+    """Yield (path, template Refs) for each leaf of the unbound template."""
+    if isinstance(node, Structural):
+      scopes = node._compose_scopes(node._scopes + scopes)
+      for key, value in node._schema_data.items():
+        if value is not Empty:
+          for leaf in cls._leaves(value, scopes, path + (key,)):
+            yield leaf
+    elif isinstance(node, ListContainer):
+      for index, element in enumerate(node._values):
+        for leaf in cls._leaves(element, node._scopes + scopes, path + (index,)):
+          yield leaf
+    elif isinstance(node, MapContainer):
+      for index, pair in enumerate(node._map):
+        for position, item in enumerate(pair):
+          for leaf in cls._leaves(item, node._scopes + scopes, path + ((index, position),)):
+            yield leaf
+    elif not node.is_literal():
+      refs = set(node._iter_free_refs(scopes))
+      if isinstance(node._value, str):
+        refs.update(MustacheParser.refs(node._value))
+      yield path, frozenset(refs)
+
+  @classmethod
+  def _lookup(cls, scopes, ref):
+    for scope in scopes:
+      try:
+        return scope.find(ref)
+      except Namable.Error:
+        continue
+    return cls.MISSING
+
+  @classmethod
+  def _same(cls, a, b):
+    if a is b:
+      return True
+    try:
+      return type(a) is type(b) and bool(a == b)
+    except Exception:
+      return False
+
+  def _closure(self, scopes, refs):
+    """The Refs a leaf depends on: its template Refs and those of the values they bind to."""
+    closure, stack = set(), list(refs)
+    while stack:
+      ref = stack.pop()
+      if ref in closure:
+        continue
+      closure.add(ref)
+      value = self._lookup(scopes, ref)
+      if isinstance(value, str):
+        stack.extend(MustacheParser.refs(value))
+      elif isinstance(value, Object):
+        stack.extend(value.free_refs())
+    return closure
+
+  def _reinterpolate(self, node, previous, dirty, path):
+    """
+      Interpolate the dirty leaves under `node`, a scoped copy of the subtree at
+      `path`, reusing the clean subtrees of its previous interpolation.
+    """
+    if dirty is not True and previous is not None and not dirty:
+      return previous
+    if isinstance(node, Structural):
+      scopes = node.scopes()
+      values = {}
+      for key, value in node._schema_data.items():
+        if value is Empty:
+          values[key] = Empty
+        else:
+          values[key] = self._reinterpolate(value.in_scope(*scopes),
+              previous._schema_data[key] if previous is not None else None,
+              dirty if dirty is True else dirty.get(key, {}), path + (key,))
+      return node.__class__(**values)
+    elif isinstance(node, ListContainer):
+      scopes = node.scopes()
+      return node.__class__([
+          self._reinterpolate(element.in_scope(*scopes),
+              previous._values[index] if previous is not None else None,
+              dirty if dirty is True else dirty.get(index, {}), path + (index,))
+          for index, element in enumerate(node._values)])
+    elif isinstance(node, MapContainer):
+      scopes = node.scopes()
+      return node.__class__(*[
+          tuple(self._reinterpolate(item.in_scope(*scopes),
+                    previous._map[index][position] if previous is not None else None,
+                    dirty if dirty is True else dirty.get((index, position), {}),
+                    path + ((index, position),))
+                for position, item in enumerate(pair))
+          for index, pair in enumerate(node._map)])
+    interpolated, unbound = node.interpolate()
+    if path in self._template_refs:
+      self._dependencies[path] = self._closure(self._scopes, self._template_refs[path])
+      self._unbound[path] = unbound
+    return interpolated
+
+  def _dirty(self, scopes):
+    changed = set()
+    for refs in self._dependencies.values():
+      for ref in refs - changed:
+        if not self._same(self._lookup(self._scopes, ref), self._lookup(scopes, ref)):
+          changed.add(ref)
+    trie = {}
+    for path, refs in self._dependencies.items():
+      if refs & changed:
+        if not path:
+          return True
+        node = trie
+        for component in path[:-1]:
+          node = node.setdefault(component, {})
+        node[path[-1]] = True
+    return trie
+
+  def interpolate(self, *args, **kw):
+    """
+      Interpolate the template bound to the given scopes, as with
+      template.bind(*args, **kw).interpolate().
+    """
+    scopes = tuple(reversed(Object.translate_to_scopes(*args, **kw)))
+    dirty = True if self._result is None else self._dirty(scopes)
+    self._scopes = scopes
+    self._result = self._reinterpolate(self._template.bind(*args, **kw), self._result, dirty, ())
+    unbound = set()
+    for refs in self._unbound.values():
+      unbound.update(refs)
+    return self._result, list(unbound)
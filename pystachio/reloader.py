@@ -0,0 +1,186 @@
+import os
+import time
+import types
+
+from .config import Config, ConfigContext, ConfigSnapshot
+
+
+class ConfigReloader(object):
+  """
+    Incrementally reload a file-backed Config as its files change.
+
+    Changed files are detected by polling os.stat().  On reload only the changed
+    files and the files that (transitively) include them are re-executed; the
+    definitions of every other file are carried over from the previous load.
+
+    Carrying definitions over is only sound when files don't depend on each other's
+    names: if a re-executed file rebinds names bound elsewhere, defines names that
+    a carried-over file rebound or could have read (because it ran after them), or
+    stops including a file, or if a carried-over file defines a mutable container
+    (which re-executed files may have mutated in place), the reloader falls back to
+    a full load.  Carried-over functions and classes are rebound to the new
+    environment (see ConfigSnapshot).
+  """
+
+  IGNORED_NAMES = frozenset(['__builtins__', 'include'])
+
+  def __init__(self, filename, schema=None, code_cache=None, base=None):
+    self._filename = os.path.abspath(filename)
+    self._schema = schema
+    self._code_cache = code_cache
+    self._base = base
+    self._full_reload()
+
+  @property
+  def config(self):
+    return self._config
+
+  @property
+  def environment(self):
+    return self._config.environment
+
+  @property
+  def include_graph(self):
+    """The include graph of the current environment, including carried-over files."""
+    return self._include_graph
+
+  @classmethod
+  def _stat(cls, path):
+    try:
+      st = os.stat(path)
+    except OSError:
+      return None
+    return (st.st_mtime_ns, st.st_size)
+
+  def _snapshot_stats(self):
+    self._stats = dict((path, self._stat(path)) for path in self._include_graph
+                       if path != ConfigContext.ROOT)
+
+  def changed_files(self):
+    """Return the set of files whose stat has changed since the last load."""
+    return set(path for path, stat in self._stats.items() if self._stat(path) != stat)
+
+  def _dirty(self, changed):
+    """The changed files and every file that transitively includes one of them."""
+    includers = {}
+    for path, node in self._include_graph.items():
+      for child in node.includes:
+        includers.setdefault(child, set()).add(path)
+    dirty, stack = set(), list(changed)
+    while stack:
+      path = stack.pop()
+      if path in dirty:
+        continue
+      dirty.add(path)
+      stack.extend(includers.get(path, ()))
+    dirty.discard(ConfigContext.ROOT)
+    return dirty
+
+  def _reachable(self, graph):
+    seen, stack = set(), [ConfigContext.ROOT]
+    while stack:
+      path = stack.pop()
+      if path in seen or path not in graph:
+        continue
+      seen.add(path)
+      stack.extend(graph[path].includes)
+    return seen
+
+  def _full_reload(self):
+    self._config = Config(self._filename, schema=self._schema, code_cache=self._code_cache,
+        base=self._base, track_definitions=True)
+    self._include_graph = dict(self._config.include_graph)
+    self._snapshot_stats()
+
+  def _incremental_reload(self, dirty):
+    environment = self._config.environment
+    stale = set()
+    for path in dirty:
+      node = self._include_graph.get(path)
+      if node is not None:
+        if node.rebinds:
+          return False
+        stale.update(node.defines)
+    clean = dict((path, node) for path, node in self._include_graph.items()
+                 if path not in dirty and path != ConfigContext.ROOT)
+    # Files that could read names bound by a re-executed file must be executed again.
+    if any((node.rebinds | node.visible) & stale for node in clean.values()):
+      return False
+    # Containers carried over may have been mutated in place by the files re-executed.
+    carried = set().union(*(node.defines for node in clean.values()))
+    if any(ConfigSnapshot.is_mutable(name, environment[name])
+           for name in carried if name in environment):
+      return False
+    base = ConfigSnapshot(
+        dict((name, value) for name, value in environment.items() if name not in stale),
+        clean)
+    config = Config(self._filename, code_cache=self._code_cache, base=base,
+        track_definitions=True)
+    include_graph = dict(clean)
+    include_graph.update(config.include_graph)
+    if not set(clean) <= self._reachable(include_graph):
+      return False
+    self._config, self._include_graph = config, include_graph
+    self._snapshot_stats()
+    return True
+
+  def _changed_names(self, old, new):
+    def same(a, b):
+      if a is b:
+        return True
+      if isinstance(a, types.FunctionType) and isinstance(b, types.FunctionType):
+        # Functions are rebound to every new environment.
+        return (a.__code__ == b.__code__ and a.__defaults__ == b.__defaults__ and
+                a.__kwdefaults__ == b.__kwdefaults__)
+      if isinstance(a, type) and isinstance(b, type):
+        attributes = lambda klass: dict((name, value) for name, value in vars(klass).items()
+                                        if name not in ('__dict__', '__weakref__'))
+        a_attributes, b_attributes = attributes(a), attributes(b)
+        return (type(a) is type(b) and a.__qualname__ == b.__qualname__ and
+                len(a.__bases__) == len(b.__bases__) and
+                all(same(x, y) for x, y in zip(a.__bases__, b.__bases__)) and
+                set(a_attributes) == set(b_attributes) and
+                all(same(a_attributes[name], b_attributes[name]) for name in a_attributes))
+      if isinstance(a, (staticmethod, classmethod)) and type(a) is type(b):
+        return same(a.__func__, b.__func__)
+      if isinstance(a, property) and isinstance(b, property):
+        return same(a.fget, b.fget) and same(a.fset, b.fset) and same(a.fdel, b.fdel)
+      if type(a) is not type(b) and same(type(a), type(b)):
+        # Instances of classes rebuilt for each snapshot clone.
+        return getattr(a, '__dict__', None) == getattr(b, '__dict__', None)
+      try:
+        return type(a) is type(b) and bool(a == b)
+      except Exception:
+        return False
+    names = (set(old) | set(new)) - self.IGNORED_NAMES
+    return set(name for name in names
+               if name not in old or name not in new or not same(old[name], new[name]))
+
+  def reload(self, changed=None):
+    """
+      Reload the config after the given files (by default, those reported by
+      changed_files()) changed.  Returns the set of top-level names whose values
+      were added, removed or changed.
+    """
+    changed = self.changed_files() if changed is None else set(changed)
+    if not changed:
+      return set()
+    old = self._config.environment
+    if not self._incremental_reload(self._dirty(changed)):
+      self._full_reload()
+    return self._changed_names(old, self._config.environment)
+
+  def poll(self):
+    """Reload if any file changed since the last load.  Returns the changed names."""
+    return self.reload()
+
+  def watch(self, callback, interval=1.0, should_stop=lambda: False):
+    """
+      Poll for changes every `interval` seconds, invoking callback(changed_names)
+      after each reload that changed at least one name, until should_stop() is true.
+    """
+    while not should_stop():
+      changed_names = self.poll()
+      if changed_names:
+        callback(changed_names)
+      time.sleep(interval)
@@ -0,0 +1,106 @@
+import time
+
+from .parsing import MustacheParser
+
+
+class BatchBinding(object):
+  """
+    The state of binding an object to values fetched in batches.  Iterating yields
+    each batch of Refs to fetch; the values fetched for it are passed to update().
+
+      >>> binding = BatchBinding(obj)
+      >>> for refs in binding:
+      ...   binding.update(fetch(refs))
+      >>> bound = binding.bound()
+  """
+
+  def __init__(self, obj):
+    self._obj = obj
+    self._bindings = {}
+    self._requested = set()
+    self._exhausted = False
+
+  def __iter__(self):
+    for _ in range(MustacheParser.MAX_ITERATIONS):
+      if self._exhausted:
+        return
+      refs = self.bound().free_refs() - self._requested
+      if not refs:
+        return
+      self._requested.update(refs)
+      yield refs
+
+  def update(self, resolved):
+    """Bind the values fetched for the last batch.  Fetching stops once none are found."""
+    if not resolved:
+      self._exhausted = True
+    self._bindings.update(resolved)
+
+  def bound(self):
+    """The object bound to every value fetched so far."""
+    return self._obj.bind(self._bindings) if self._bindings else self._obj
+
+
+class Resolver(object):
+  """
+    A batch source of values for Refs, e.g. a secret store or package registry.
+
+    Rather than being consulted one Ref at a time during interpolation like a
+    Namable, a Resolver is handed every unbound Ref of an object at once, so N
+    leaves cost one round trip instead of N.
+  """
+
+  def resolve(self, refs):
+    """
+      Given a collection of Refs, return a dict mapping those Refs this resolver
+      knows about to their values (strings, numbers or Objects).
+    """
+    raise NotImplementedError
+
+  def bind(self, obj):
+    """
+      Return obj bound to the values of its unbound Refs.  Values may themselves
+      be templates, in which case the Refs they introduce are fetched in a further
+      batch; Refs this resolver does not know about are left unbound.
+    """
+    binding = BatchBinding(obj)
+    for refs in binding:
+      binding.update(self.resolve(refs))
+    return binding.bound()
+
+
+class CachingResolver(Resolver):
+  """
+    Wrap a Resolver with a time-to-live cache.  Refs the wrapped resolver does not
+    know about are cached too, so they are not asked for again until they expire.
+  """
+
+  MISSING = object()
+
+  def __init__(self, resolver, ttl, clock=time.time):
+    self._resolver = resolver
+    self._ttl = ttl
+    self._clock = clock
+    self._cache = {}
+
+  def invalidate(self):
+    self._cache.clear()
+
+  def resolve(self, refs):
+    now = self._clock()
+    resolved, misses = {}, []
+    for ref in refs:
+      expiry, value = self._cache.get(ref, (None, None))
+      if expiry is None or expiry <= now:
+        misses.append(ref)
+      elif value is not self.MISSING:
+        resolved[ref] = value
+    if misses:
+      fetched = self._resolver.resolve(misses)
+      expiry = now + self._ttl
+      for ref in misses:
+        value = fetched.get(ref, self.MISSING)
+        self._cache[ref] = (expiry, value)
+        if value is not self.MISSING:
+          resolved[ref] = value
+    return resolved
@@ -0,0 +1,234 @@
+"""
+  A memory-mapped, read-only store of rendered Structs keyed by name.
+
+  Stores are written once, with ConfigStore.write(), and opened by any number of
+  reader processes, which map the file rather than read it: the page cache keeps
+  one copy of the data for every process on the host, opening a store reads only
+  its header, and a lookup is a binary search over a fixed-width index.
+
+  Records use the binary encoding of pystachio.binary, with a table of field
+  offsets in front of each record so that a field can be decoded without
+  decoding the fields before it.  store[key] returns a StoredRecord whose fields
+  are decoded on first access:
+
+    >>> store = ConfigStore('jobs.store', Job)
+    >>> store['www-data/prod/hello'].instances()
+    Integer(3)
+
+  File layout (all integers little-endian):
+
+    header   magic, version, schema fingerprint, record count, index offset
+    records  per record: presence bitmap, u32 end offset of every field, fields
+    keys     UTF-8 keys, concatenated
+    index    per record, in key order: key offset, key length, record offset,
+             record length
+"""
+
+import mmap
+import os
+import struct
+
+from . import binary
+from .composite import Empty, Structural
+
+MAGIC = b'PYST'
+VERSION = 1
+_HEADER = struct.Struct('<4sB8sQQ')
+_INDEX_ENTRY = struct.Struct('<QIQI')
+_FIELD_END = struct.Struct('<I')
+
+
+class StoredRecord(object):
+  """
+    A lazily decoded Struct in a ConfigStore.  Fields are accessed as on the
+    Struct itself (record.name(), record.has_name()) and decoded on first access;
+    struct() decodes the whole record.
+  """
+
+  def __init__(self, store, offset):
+    self._store = store
+    self._offset = offset
+    self._fields = {}
+
+  def _field(self, name):
+    if name not in self._fields:
+      self._fields[name] = self._store._read_field(self._offset, name)
+    return self._fields[name]
+
+  def __getattr__(self, attr):
+    schema = self._store.schema
+    if attr.startswith('has_') and attr[4:] in schema.TYPEMAP:
+      return lambda: self._field(attr[4:]) is not Empty
+    if attr not in schema.TYPEMAP:
+      raise AttributeError('%s has no attribute %s' % (schema.__name__, attr))
+    return lambda: self._field(attr)
+
+  def struct(self):
+    """The record as an instance of the store's schema."""
+    schema = self._store.schema
+    return schema(**dict((name, self._field(name)) for name in schema.TYPEMAP))
+
+  def __repr__(self):
+    return 'StoredRecord(%s)' % self._store.schema.__name__
+
+
+class ConfigStore(object):
+  """A read-only mapping from keys to Structs of one schema, backed by a mapped file."""
+
+  class Error(ValueError): pass
+
+  def __init__(self, filename, schema):
+    if not issubclass(schema, Structural):
+      raise TypeError('ConfigStore schemas must be Structs, got %s' % schema.__name__)
+    self.schema = schema
+    self._fields = self._layout(schema)
+    self._field_index = dict((name, (index, codec))
+                             for index, (name, codec) in enumerate(self._fields))
+    self._bitmap_size = (len(self._fields) + 7) // 8
+    with open(filename, 'rb') as fp:
+      # mmap refuses empty files, so check the size before mapping.
+      if os.fstat(fp.fileno()).st_size < _HEADER.size:
+        raise self.Error('%s is not a config store.' % filename)
+      self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, fingerprint, self._count, self._index_offset = _HEADER.unpack_from(self._mmap)
+    if magic != MAGIC or version != VERSION:
+      self._mmap.close()
+      raise self.Error('%s is not a version %d config store.' % (filename, VERSION))
+    if self._index_offset + self._count * _INDEX_ENTRY.size > len(self._mmap):
+      self._mmap.close()
+      raise self.Error('%s is a truncated config store.' % filename)
+    if fingerprint != binary.fingerprint(schema):
+      self._mmap.close()
+      raise binary.SchemaMismatch('%s was not written with the schema of %s.' % (
+          filename, schema.__name__))
+
+  @classmethod
+  def _layout(cls, schema):
+    """(name, codec) for each field of schema, in record order."""
+    return [(name, binary.compile_codec(schema.TYPEMAP[name].klazz))
+            for name in sorted(schema.TYPEMAP)]
+
+  @classmethod
+  def _encode_record(cls, fields, obj):
+    if not obj.is_literal():
+      obj, _ = obj.interpolate()
+    bitmap = bytearray((len(fields) + 7) // 8)
+    ends = bytearray()
+    payload = bytearray()
+    for index, (name, codec) in enumerate(fields):
+      value = obj._schema_data[name]
+      if value is not Empty:
+        bitmap[index >> 3] |= 1 << (index & 7)
+        codec.write(payload, value)
+      ends += _FIELD_END.pack(len(payload))
+    return bytes(bitmap + ends + payload)
+
+  @classmethod
+  def write(cls, filename, schema, items):
+    """
+      Write a store of the (key, Struct) pairs in items (or a Mapping) to filename.
+      The file is replaced atomically, so readers never observe a partial store.
+    """
+    fields = cls._layout(schema)
+    if hasattr(items, 'items'):
+      items = items.items()
+    dirname = os.path.dirname(os.path.abspath(filename))
+    # Unlike mkstemp, which creates files readable only by their owner, create the
+    # temporary file subject to the umask so that readers running as other users
+    # can open the store.
+    tmp = os.path.join(dirname, '.tmp-store-' + os.urandom(8).hex())
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+      with os.fdopen(fd, 'wb') as fp:
+        fp.write(bytes(_HEADER.size))
+        offset, records = _HEADER.size, {}
+        for key, obj in items:
+          if key in records:
+            raise cls.Error('Duplicate key %r' % key)
+          if not isinstance(obj, schema):
+            obj = schema(obj)
+          record = cls._encode_record(fields, obj)
+          fp.write(record)
+          records[key] = (offset, len(record))
+          offset += len(record)
+        keys = sorted((key.encode('utf-8'), key) for key in records)
+        key_offsets = []
+        for encoded, _ in keys:
+          key_offsets.append(offset)
+          fp.write(encoded)
+          offset += len(encoded)
+        index_offset = offset
+        for (encoded, key), key_offset in zip(keys, key_offsets):
+          fp.write(_INDEX_ENTRY.pack(key_offset, len(encoded), *records[key]))
+        fp.seek(0)
+        fp.write(_HEADER.pack(MAGIC, VERSION, binary.fingerprint(schema), len(keys), index_offset))
+      os.replace(tmp, filename)
+    except BaseException:
+      os.unlink(tmp)
+      raise
+    return len(records)
+
+  def _entry(self, position):
+    return _INDEX_ENTRY.unpack_from(self._mmap, self._index_offset + position * _INDEX_ENTRY.size)
+
+  def _key(self, position):
+    key_offset, key_length, _, _ = self._entry(position)
+    return self._mmap[key_offset:key_offset + key_length]
+
+  def _find(self, key):
+    """The offset of the record for key, or None."""
+    encoded = key.encode('utf-8')
+    low, high = 0, self._count
+    while low < high:
+      middle = (low + high) // 2
+      if self._key(middle) < encoded:
+        low = middle + 1
+      else:
+        high = middle
+    if low < self._count and self._key(low) == encoded:
+      return self._entry(low)[2]
+    return None
+
+  def _read_field(self, offset, name):
+    index, codec = self._field_index[name]
+    if not self._mmap[offset + (index >> 3)] & (1 << (index & 7)):
+      return Empty
+    ends = offset + self._bitmap_size
+    start = 0
+    if index:
+      start, = _FIELD_END.unpack_from(self._mmap, ends + _FIELD_END.size * (index - 1))
+    value, _ = codec.read(self._mmap, ends + _FIELD_END.size * len(self._fields) + start)
+    return value
+
+  def __len__(self):
+    return self._count
+
+  def __contains__(self, key):
+    return self._find(key) is not None
+
+  def __iter__(self):
+    return self.keys()
+
+  def keys(self):
+    """Iterate over the keys of the store, in sorted order."""
+    for position in range(self._count):
+      yield self._key(position).decode('utf-8')
+
+  def __getitem__(self, key):
+    offset = self._find(key)
+    if offset is None:
+      raise KeyError(key)
+    return StoredRecord(self, offset)
+
+  def get(self, key, default=None):
+    offset = self._find(key)
+    return default if offset is None else StoredRecord(self, offset)
+
+  def close(self):
+    self._mmap.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
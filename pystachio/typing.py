@@ -57,11 +57,21 @@ TypeFactoryClass = TypeFactoryType('TypeFactoryClass', (object,), {})
 class TypeFactory(TypeFactoryClass):
   @staticmethod
   def get_factory(type_name):
+    if type_name not in TypeFactoryType._TYPE_FACTORIES:
+      TypeFactory.load_builtin_factories()
     assert type_name in TypeFactoryType._TYPE_FACTORIES, (
       'Unknown type: %s, Existing factories: %s' % (
         type_name, TypeFactoryType._TYPE_FACTORIES.keys()))
     return TypeFactoryType._TYPE_FACTORIES[type_name]
 
+  @staticmethod
+  def load_builtin_factories():
+    """
+      Register the factories for the builtin types.  They register themselves on
+      import, which may not have happened yet if pystachio was imported lazily.
+    """
+    from . import basic, choice, composite, container  # noqa
+
   @staticmethod
   def create(type_dict, *type_parameters, **kwargs):
     """
@@ -0,0 +1,187 @@
+"""
+  Validation of plain data against a schema without building Pystachio objects.
+
+  A validator is compiled once per type and walks plain dicts, lists, strings and
+  numbers directly against the schema, applying the coercion rules of the types'
+  coerce() and checker() classmethods, so validate(cls, data) agrees with
+  cls(data).check() without allocating any Objects on the way.  Inputs that
+  cls(data) would reject outright (e.g. a list where a Struct is expected) fail
+  validation instead of raising.
+
+  Templates can only be checked once interpolated against their scopes, so data
+  containing '{{', or Objects, or types other than the builtin ones, is instead
+  validated by building it and calling check().
+"""
+
+from collections.abc import Mapping
+from functools import lru_cache
+
+from .base import Object
+from .basic import Boolean, EnumContainer, Float, Integer, String
+from .choice import ChoiceContainer
+from .composite import Empty, Structural
+from .container import ListContainer, MapContainer
+from .typing import TypeCheck
+
+# Leaf types for which a value coercing successfully implies it checks.
+_COERCED_TYPES = (Boolean, EnumContainer, Float, Integer, String)
+
+
+class NeedsInterpolation(Exception):
+  """Raised by validators for data that can only be checked as Objects."""
+
+
+def _leaf_validator(cls):
+  coerce = cls.coerce
+  error = cls.CoercionError
+  if issubclass(cls, EnumContainer):
+    # Enums reject values outside the enumeration when constructed.
+    enum_error = '%s only accepts the following values: %s' % (cls.__name__, ', '.join(cls.VALUES))
+  else:
+    enum_error = None
+
+  def validate(value):
+    if isinstance(value, str):
+      if '{{' in value:
+        raise NeedsInterpolation()
+    elif isinstance(value, Object):
+      raise NeedsInterpolation()
+    try:
+      coerce(value)
+    except error as e:
+      return enum_error or 'Unable to interpolate: %s' % e
+
+  return validate
+
+
+def _struct_validator(cls, strict):
+  name = cls.__name__
+  fields = []
+  for attr, sig in cls.TYPEMAP.items():
+    if sig.empty:
+      default = None
+    elif sig.default.is_literal():
+      # Defaults are shared by every instance, so check each once.
+      default = sig.default.check()
+    else:
+      default = NeedsInterpolation
+    fields.append((attr, sig.required, default, compile_validator(sig.klazz, strict)))
+
+  def validate(data):
+    if isinstance(data, Object):
+      raise NeedsInterpolation()
+    if not isinstance(data, Mapping):
+      return '%s expects a mapping, got %r' % (name, data)
+    if strict:
+      for attr in data:
+        if attr not in cls.TYPEMAP:
+          return 'Unknown schema attribute %s' % attr
+    for attr, required, default, validator in fields:
+      value = data.get(attr, Empty)
+      if value is not Empty:
+        message = validator(value)
+        if message is not None:
+          return '%s[%s] failed: %s' % (name, attr, message)
+      elif default is None:
+        if required:
+          return '%s[%s] is required.' % (name, attr)
+      elif default is NeedsInterpolation:
+        raise NeedsInterpolation()
+      elif not default.ok():
+        return '%s[%s] failed: %s' % (name, attr, default.message())
+
+  return validate
+
+
+def _list_validator(cls, strict):
+  name = cls.__name__
+  element_validator = compile_validator(cls.TYPE, strict)
+
+  def validate(values):
+    if isinstance(values, Object):
+      raise NeedsInterpolation()
+    if not ListContainer.isiterable(values):
+      return 'ListContainer expects an iterable, got %r' % (values,)
+    for value in values:
+      message = element_validator(value)
+      if message is not None:
+        return 'Element in %s failed check: %s' % (name, message)
+
+  return validate
+
+
+def _map_validator(cls, strict):
+  name = cls.__name__
+  key_validator = compile_validator(cls.KEYTYPE, strict)
+  value_validator = compile_validator(cls.VALUETYPE, strict)
+
+  def validate(values):
+    if not isinstance(values, Mapping) or isinstance(values, Object):
+      raise NeedsInterpolation()
+    for key, value in values.items():
+      key_message = key_validator(key)
+      value_message = value_validator(value)
+      if key_message is not None:
+        return '%s key %s failed check: %s' % (name, key, key_message)
+      if value_message is not None:
+        return '%s[%s] value %s failed check: %s' % (name, key, value, value_message)
+
+  return validate
+
+
+def _choice_validator(cls, strict):
+  name = cls.__name__
+  validators = [compile_validator(choice, strict) for choice in cls.CHOICES]
+
+  def validate(value):
+    if isinstance(value, Object):
+      raise NeedsInterpolation()
+    for validator in validators:
+      if validator(value) is None:
+        return None
+    return '%s typecheck failed: value %s did not match any of its alternatives' % (name, value)
+
+  return validate
+
+
+def _object_validator(cls, strict):
+  def validate(value):
+    raise NeedsInterpolation()
+  return validate
+
+
+@lru_cache(maxsize=None)
+def compile_validator(cls, strict=True):
+  """
+    Compile a function that returns None if plain data checks as the type cls, or
+    the message of the failed check otherwise.  It raises NeedsInterpolation for
+    data it cannot validate without building Objects.
+  """
+  if issubclass(cls, Structural):
+    return _struct_validator(cls, strict)
+  elif issubclass(cls, ListContainer):
+    return _list_validator(cls, strict)
+  elif issubclass(cls, MapContainer):
+    return _map_validator(cls, strict)
+  elif issubclass(cls, ChoiceContainer):
+    return _choice_validator(cls, strict)
+  elif issubclass(cls, _COERCED_TYPES):
+    return _leaf_validator(cls)
+  return _object_validator(cls, strict)
+
+
+def validate(cls, data, strict=True):
+  """
+    Return the TypeCheck of cls(data).check(), or a failure if cls(data) would
+    raise.  If not strict, keys unknown to a Struct's schema are ignored.
+  """
+  try:
+    message = compile_validator(cls, strict)(data)
+  except NeedsInterpolation:
+    from .decoder import compile_decoder
+    try:
+      obj = compile_decoder(cls, strict)(data)
+    except (AttributeError, TypeError, ValueError) as e:
+      return TypeCheck.failure(str(e))
+    return obj.check()
+  return TypeCheck.success() if message is None else TypeCheck.failure(message)
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+
+from pystachio import *
+from pystachio.aio import AsyncResolver, Walker
+from pystachio.base import Object
+
+
+class SlowResolver(AsyncResolver):
+  def __init__(self, values, delay=0.05):
+    self.values = values
+    self.delay = delay
+
+  async def find(self, ref):
+    await asyncio.sleep(self.delay)
+    if ref.address() not in self.values:
+      raise Namable.NotFound(self, ref)
+    return self.values[ref.address()]
+
+
+class Resources(Struct):
+  cpu = Required(Float)
+  ram = Integer
+
+
+class Process(Struct):
+  name = Required(String)
+  resources = Resources
+  ports = Map(String, Integer)
+
+
+def run(coroutine):
+  return asyncio.run(coroutine)
+
+
+def test_ainterpolate_matches_interpolate():
+  processes = List(Process)([
+    Process(name = 'p{{index}}-%d' % k, resources = Resources(cpu = '{{cores}}', ram = k),
+            ports = {'http': '{{port}}'})
+    for k in range(250)])
+  for obj in (processes, processes.bind(cores = 1.0, index = 'a'), processes.bind(port = 80),
+              String('{{a}}'), Process(name = 'solo')):
+    interpolated, unbound = run(obj.ainterpolate())
+    expected_interpolated, expected_unbound = obj.interpolate()
+    assert interpolated == expected_interpolated
+    assert set(unbound) == set(expected_unbound)
+    assert repr(run(obj.acheck())) == repr(obj.check())
+
+  with pytest.raises(Object.CoercionError):
+    run(processes.bind(port = 'x').ainterpolate())
+  assert repr(run(processes.bind(port = 'x').acheck())) == repr(processes.bind(port = 'x').check())
+
+  for obj in (Process(), Process(name = 'a', resources = Resources()),
+              Process(name = 'a', ports = {'a': '{{x}}'}), List(Integer)([1, 'two'])):
+    assert repr(run(obj.acheck())) == repr(obj.check())
+
+
+def test_async_resolvers_run_concurrently():
+  process = Process(name = '{{a}}-{{b}}-{{c}}-{{d}}', resources = Resources(cpu = '{{cores}}'))
+  resolvers = (SlowResolver({'a': 'A', 'b': 'B', 'cores': 2}, delay = 0.1),
+               SlowResolver({'a': 'shadowed', 'c': 'C'}, delay = 0.1))
+
+  start = time.monotonic()
+  interpolated, unbound = run(process.ainterpolate(*resolvers))
+  assert time.monotonic() - start < 0.3
+  assert interpolated == Process(name = 'A-B-C-{{d}}', resources = Resources(cpu = 2.0))
+  assert unbound == [Ref.from_address('d')]
+  assert run(process.acheck(*resolvers)).ok()
+
+
+def test_walker_yields_to_loop():
+  ticks = []
+
+  async def ticker():
+    while True:
+      ticks.append(None)
+      await asyncio.sleep(0)
+
+  async def main():
+    task = asyncio.ensure_future(ticker())
+    await Walker(yield_every = 10).interpolate(List(String)(['{{a}}'] * 100))
+    task.cancel()
+
+  run(main())
+  assert len(ticks) >= 10
+
+
+def test_acheck_shares_check_cache():
+  process = Process(name = 'p', resources = Resources(cpu = 1.0), ports = {'http': 80})
+  type_check = run(process.acheck())
+  assert type_check.ok()
+  assert process.check() is type_check
+  assert run(process.acheck()) is type_check
@@ -1,9 +1,12 @@
 import pytest
 
 from pystachio.base import Environment, Object
-from pystachio.basic import Integer
-from pystachio.container import List
+from pystachio.basic import Float, Integer, String
+from pystachio.choice import Choice
+from pystachio.composite import Struct
+from pystachio.container import List, Map
 from pystachio.naming import Namable, Ref
+from pystachio.typing import Type, TypeCheck, TypeFactory
 
 
 def dtd(d):
@@ -111,3 +114,98 @@ def test_object_unimplementeds():
     o.get()
   with pytest.raises(NotImplementedError):
     oi = o.interpolate()
+
+
+class Opaque(Object, Type):
+  """An Object implementing only the methods Object requires."""
+
+  def __init__(self, value):
+    self._value = value
+    super(Opaque, self).__init__()
+
+  def get(self):
+    return self._value
+
+  def dup(self):
+    return Opaque(self._value)
+
+  def interpolate(self):
+    return Opaque(self._value), []
+
+  @classmethod
+  def checker(cls, obj):
+    return TypeCheck.success()
+
+  @classmethod
+  def type_factory(cls):
+    return 'Opaque'
+
+  @classmethod
+  def type_parameters(cls):
+    return ()
+
+
+class OpaqueFactory(TypeFactory):
+  PROVIDES = 'Opaque'
+
+  @staticmethod
+  def create(type_dict, *type_parameters):
+    return Opaque
+
+
+def test_object_defaults():
+  class Job(Struct):
+    opaque = Opaque
+    name = String
+
+  job = Job(opaque = Opaque(1), name = '{{who}}')
+  assert not Opaque(1).is_literal()
+  assert job.free_refs() == frozenset([ref('who')])
+  assert job.bind(who = 'a').check().ok()
+  assert job.bind(who = 'a').interpolate()[0].opaque().get() == 1
+
+
+def test_free_refs():
+  class Resources(Struct):
+    cpu = Float
+    ram = Integer
+
+  class Process(Struct):
+    name = String
+    cmdline = String
+    resources = Resources
+    ports = Map(String, Integer)
+    args = List(String)
+    weight = Choice([Integer, String])
+
+  template = Process(
+    name = '{{role}}-{{self.cmdline}}',
+    cmdline = 'run {{args[0]}} {{&literal}}',
+    resources = Resources(cpu = '{{cores}}', ram = 1024),
+    ports = {'{{port_name}}': '{{port}}'},
+    args = ['{{arg}}', 'b'],
+    weight = '{{w}}',
+  )
+
+  def check(obj):
+    assert obj.free_refs() == frozenset(obj.interpolate()[1])
+    assert obj.is_fully_bound() == (not obj.interpolate()[1])
+
+  check(template)
+  assert template.free_refs() == frozenset(ref(address) for address in (
+      'role', 'cores', 'port_name', 'port', 'arg', 'w', 'literal'))
+  check(template.bind(role = 'web', cores = 1, w = 3))
+  check(template.bind(role = '{{arg}}', cores = 1, port_name = 'http', port = 80, arg = 'a',
+                      w = 3))
+  assert template.bind(role = '{{arg}}', cores = 1, port_name = 'http', port = 80, arg = 'a',
+                       w = 3, literal = 'x').is_fully_bound()
+  check(template.resources())
+  check(Resources(cpu = 1.0).in_scope(cpu = 2))
+  check(List(Resources)([Resources(cpu = '{{a}}'), Resources(ram = '{{b}}')]).bind(a = 1))
+
+  literal = Process(name = 'literal', resources = Resources(cpu = 1.0), args = ['a'])
+  assert literal.is_literal()
+  assert literal.free_refs() == frozenset()
+  assert literal.is_fully_bound()
+  assert not template.is_literal()
+  assert not template.is_fully_bound()
@@ -0,0 +1,72 @@
+import io
+import json
+
+import pytest
+
+from pystachio import binary
+from pystachio.basic import Boolean, Enum, Float, Integer, String
+from pystachio.choice import Choice
+from pystachio.composite import Default, Required, Struct
+from pystachio.container import List, Map
+
+
+class Resources(Struct):
+  cpu = Required(Float)
+  ram = Integer
+  disk = Default(Integer, 1 << 40)
+
+
+class Process(Struct):
+  name = String
+  tier = Enum('Tier', ('preemptible', 'production'))
+  daemon = Boolean
+  resources = Resources
+  env = Map(String, String)
+  ports = List(Integer)
+  value = Choice([Integer, String])
+
+
+def test_roundtrip():
+  processes = [
+    Process(),
+    Process(name=u'caf\xe9', tier='production', daemon=True, value=-3,
+            resources=Resources(cpu=0.25, ram=-(1 << 70), disk=0),
+            env={'HOME': '/home/{{role}}', '': ''}, ports=[0, 1, 127, 128, 1 << 64]),
+    Process(name='{{role}}', ports=['{{port}}'], value='{{role}}').bind(role='www', port=80),
+    Process(resources=Resources(cpu='{{cores}}'), value='x').bind(cores=2),
+  ]
+  for process in processes:
+    data = binary.encode(process)
+    assert data.startswith(binary.MAGIC)
+    decoded = binary.decode(Process, data)
+    assert decoded == process
+    assert json.loads(decoded.json_dumps()) == json.loads(process.json_dumps())
+  assert len(binary.encode(processes[1])) < len(processes[1].json_dumps()) / 2
+
+  fp = io.BytesIO()
+  assert binary.dump(Process, processes * 100, fp) == 400
+  fp.seek(0)
+  assert list(binary.iter_decode(Process, fp)) == processes * 100
+
+  with pytest.raises(ValueError):
+    binary.encode(Process(ports=['{{port}}']))
+
+
+def test_header_checks():
+  data = binary.encode(Resources(cpu=1.0))
+  with pytest.raises(binary.SchemaMismatch):
+    binary.decode(Process, data)
+  with pytest.raises(binary.SchemaMismatch):
+    list(binary.iter_decode(Process, io.BytesIO(data)))
+
+  class Resources2(Struct):
+    cpu = Required(Float)
+    ram = Integer
+    disk = Default(Integer, 1 << 40)
+  assert binary.decode(Resources2, binary.encode(Resources2(cpu=1.0))) == Resources2(cpu=1.0)
+  assert binary.fingerprint(Resources2) != binary.fingerprint(Resources)
+
+  with pytest.raises(ValueError):
+    binary.decode(Resources, b'{"cpu": 1.0}')
+  with pytest.raises(ValueError):
+    list(binary.iter_decode(Resources, io.BytesIO(data[:-1])))
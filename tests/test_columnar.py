@@ -0,0 +1,67 @@
+import array
+
+import pytest
+
+from pystachio.basic import Boolean, Float, Integer, String
+from pystachio.columnar import StructArray
+from pystachio.composite import Default, Struct
+from pystachio.container import List, Map
+
+
+class Resources(Struct):
+  cpu = Float
+  ram = Integer
+
+
+class Process(Struct):
+  name = String
+  daemon = Default(Boolean, False)
+  resources = Resources
+  args = List(String)
+  env = Map(String, Integer)
+
+
+def test_struct_array():
+  processes = [
+    Process(name='p%d' % k, resources=Resources(cpu=k % 4, ram='{{memory}}'), args=['-v'] * (k % 2))
+      .bind(memory=k * 1024)
+    for k in range(100)
+  ]
+  processes.append(Process(name='bare', env={'a': '1'}))
+  processes.append({'name': 'huge', 'resources': {'ram': 1 << 80}})
+  arr = StructArray(Process, processes)
+  assert len(arr) == 102
+  assert list(arr) == processes[:-1] + [Process(name='huge', resources=Resources(ram=1 << 80))]
+  assert arr[-2] == Process(name='bare', env={'a': 1})
+  assert arr[-2].has_resources() is False
+  assert arr[0].json_dumps() == processes[0].json_dumps()
+
+  assert isinstance(arr.column('resources.cpu'), list)
+  assert arr.column('resources.cpu')[:5] == [0.0, 1.0, 2.0, 3.0, 0.0]
+  assert isinstance(arr.column('daemon'), list)
+  assert arr.column('name')[-1] == 'huge'
+  with pytest.raises(KeyError):
+    arr.column('resources')
+
+  assert arr.count('resources.cpu') == 100
+  assert arr.sum('resources.cpu') == 150.0
+  assert arr.max('resources.ram') == 1 << 80
+  assert arr.min('resources.cpu') == 0.0
+  assert arr.mean('resources.cpu') == 1.5
+
+  big = arr.filter('resources.cpu', lambda cpu: cpu >= 3)
+  assert len(big) == 25
+  assert all(process.resources().cpu().get() == 3.0 for process in big)
+  assert big.project('name')['name'][:2] == ['p3', 'p7']
+  assert len(arr[10:20]) == 10 and arr[10:20][0] == processes[10]
+  groups = arr.group_by('args')
+  assert sorted(len(group) for group in groups.values()) == [2, 50, 50]
+  assert len(groups[None]) == 2 and len(groups[('-v',)]) == 50
+
+  with pytest.raises(ValueError):
+    StructArray(Process, [Process(name='{{unbound}}')])
+
+  numeric = StructArray(Resources, [Resources(cpu=1, ram=2), Resources(cpu=2.5, ram=3)])
+  assert numeric.column('cpu') == array.array('d', [1.0, 2.5])
+  assert numeric.column('ram') == array.array('q', [2, 3])
+  assert numeric.select([False, True])[0] == Resources(cpu=2.5, ram=3)
@@ -1,9 +1,15 @@
+import io
+import json
+
 import pytest
 
 from pystachio.basic import *
+from pystachio.choice import Choice
 from pystachio.composite import *
 from pystachio.container import List, Map
+from pystachio.interning import InternTable
 from pystachio.naming import Ref
+from pystachio.parsing import MustacheParser
 
 
 def ref(address):
@@ -265,3 +271,269 @@ def test_super():
 
     def json_dumps(self):
       return super(Monitor, self).json_dumps()
+
+
+def test_json_dumps():
+  class Port(Struct):
+    name = String
+    number = Integer
+
+  class Job(Struct):
+    name = Default(String, 'job')
+    weight = Float
+    daemon = Boolean
+    value = Choice([Integer, String])
+    ports = List(Port)
+    env = Map(String, Integer)
+    args = List(String)
+
+  def legacy_json_dumps(obj):
+    return json.dumps(obj.interpolate()[0].get())
+
+  jobs = [
+    Job(),
+    Job(weight=1, daemon='true', value='{{x}}', args=[], env={}),
+    Job(ports=[Port(name='http', number='80'), Port(name='{{service}}', number='{{port}}')],
+        env={'a': '{{port}}', 1: 2, '1': 3}, args=['{{&port}}', u'caf\xe9', '{{self.name}}']),
+    Job(name='{{role}}', weight=float('nan')).bind(role='www', service='admin', port=8080, x=3),
+  ]
+  for job in jobs:
+    assert job.json_dumps() == legacy_json_dumps(job)
+    fp = io.StringIO()
+    job.json_dump(fp)
+    assert fp.getvalue() == legacy_json_dumps(job)
+  assert Job(ports=[Port(number='{{port}}')]).bind(port=80).json_dumps() == (
+      '{"name": "job", "ports": [{"number": 80}]}')
+
+
+def test_from_records():
+  Tier = Enum('Tier', ('preemptible', 'production'))
+
+  class Resources(Struct):
+    cpu = Float
+    ram = Integer
+
+  class Job(Struct):
+    name = String
+    tier = Tier
+    resources = Resources
+    ports = List(Integer)
+
+  records = [{'name': 'job%d' % k, 'tier': 'production', 'resources': {'cpu': k, 'ram': '{{memory}}'},
+              'ports': [k]} for k in range(50)]
+  records[3] = {'name': 'bad', 'tier': 'experimental'}
+  records[7] = {'name': 'bad', 'extra': 1}
+  records[11] = {'resources': 5}
+  records[13] = Job(name='already built')
+  good = [k for k in range(50) if k not in (3, 7, 11)]
+
+  for processes in (None, 2):
+    instances, errors = Job.from_records(iter(records), processes=processes, chunksize=8)
+    assert instances == [records[k] if k == 13 else Job(records[k]) for k in good]
+    assert [index for index, _ in errors] == [3, 7, 11]
+    assert isinstance(errors[0][1], ValueError)
+    assert isinstance(errors[1][1], AttributeError)
+    assert isinstance(errors[2][1], ValueError)
+
+  instances, errors = Job.from_records(records, strict=False)
+  assert len(instances) == 48 and [index for index, _ in errors] == [3, 11]
+
+
+def test_validate_raw():
+  Tier = Enum('Tier', ('preemptible', 'production'))
+
+  class Resources(Struct):
+    cpu = Required(Float)
+    ram = Default(Integer, 1024)
+    disk = Integer
+
+  class Job(Struct):
+    name = Required(String)
+    tier = Tier
+    resources = Resources
+    ports = List(Integer)
+    env = Map(String, Integer)
+    owner = Choice([Integer, String])
+    preemptible = Boolean
+
+  def built_check(data):
+    try:
+      return Job(data).check()
+    except (AttributeError, ValueError):
+      return None
+
+  for data in [
+      {'name': 'hello'},
+      {'name': 'hello', 'tier': 'production', 'resources': {'cpu': 1, 'ram': '2048'},
+       'ports': [80, '443'], 'env': {'A': 1}, 'owner': 'me', 'preemptible': 'true'},
+      {},
+      {'name': 'hello', 'resources': {'ram': 5}},
+      {'name': 'hello', 'resources': {'cpu': 'lots'}},
+      {'name': 'hello', 'ports': [80, 'http']},
+      {'name': 'hello', 'env': {'A': 'one'}},
+      {'name': 'hello', 'owner': [1]},
+      {'name': 'hello', 'preemptible': 'maybe'},
+      {'name': 'hello', 'tier': 'experimental'},
+      {'name': 'hello', 'resources': 5},
+      {'name': 'hello', 'ports': 80},
+      {'name': 'hello', 'extra': 1},
+      {'name': ['hello']},
+      {'name': '{{service}}', 'resources': {'cpu': '{{cores}}'}},
+      {'name': 'hello', 'resources': {'cpu': '{{cores}}'}},
+      {'name': 'hello', 'resources': Resources(cpu='{{cores}}')},
+  ]:
+    expected = built_check(data)
+    check = Job.validate_raw(data)
+    if expected is None:
+      assert not check.ok()
+    else:
+      assert check.ok() == expected.ok(), data
+      assert check.message() == expected.message(), data
+
+  assert Job.validate_raw({'name': 'hello', 'extra': 1}, strict=False).ok()
+  assert not Job.validate_raw({'name': 'hello', 'extra': 1}).ok()
+  assert not Job.validate_raw([]).ok()
+
+
+def test_interpolate_and_check():
+  class Resources(Struct):
+    cpu = Required(Float)
+    ram = Default(Integer, '{{memory}}')
+
+  class Process(Struct):
+    name = Required(String)
+    cmdline = String
+    resources = Resources
+    env = Map(String, Integer)
+
+  class Job(Struct):
+    processes = List(Process)
+    instances = Integer
+
+  for job in [
+      Job(processes=[Process(name='hello', resources=Resources(cpu=1))]),
+      Job(processes=[Process(name='hello', resources=Resources(cpu=1))]).bind(memory=512),
+      Job(processes=[Process(name='hello', resources=Resources(cpu='{{cores}}'))]).bind(
+          memory=512, cores='many'),
+      Job(processes=[Process(name='hello', cmdline='{{super.instances}}')], instances='{{n}}'),
+      Job(processes=[Process(name='hello', cmdline='{{super.instances}}')], instances='{{n}}').bind(
+          n=3, memory=512),
+      Job(processes=[Process(name='hello', env={'{{k}}': '{{v}}'})]).bind(k='a', v='b'),
+      Job(processes=[Process(resources=Resources())]),
+      Job(processes=[Process(name='{{self.cmdline}}', cmdline='{{self.name}}')]),
+  ]:
+    interpolated, unbound, type_check = job.interpolate_and_check()
+    expected = job.check()
+    assert (type_check.ok(), type_check.message()) == (expected.ok(), expected.message())
+    try:
+      expected_interpolated, expected_unbound = job.interpolate()
+    except (Object.CoercionError, MustacheParser.Uninterpolatable):
+      assert interpolated is None
+    else:
+      assert interpolated == expected_interpolated
+      assert set(unbound) == set(expected_unbound)
+
+
+def test_check_all():
+  class Resources(Struct):
+    cpu = Required(Float)
+    ram = Integer
+
+  class Process(Struct):
+    name = Required(String)
+    resources = Resources
+    env = Map(Integer, Integer)
+
+  class Job(Struct):
+    name = Required(String)
+    processes = List(Process)
+    instances = Integer
+
+  job = Job(name='hello', processes=[
+    Process(name='a', resources=Resources(cpu=1, ram='{{memory}}')),
+    Process(resources=Resources(cpu='{{cores}}')),
+    Process(name='c', env={'1': 'one', '{{port}}': 2}),
+  ], instances='{{count}}').bind(cores='many', port='http')
+
+  errors = job.check_all()
+  assert [(ref.address(), message) for ref, message in errors] == [
+    ('processes[0].resources.ram', "'{{memory}}' not an integer"),
+    ('processes[1].name', 'Process[name] is required.'),
+    ('processes[1].resources.cpu', "Unable to interpolate: Cannot coerce 'many' to Float"),
+    ('processes[2].env[1]', "Unable to interpolate: Cannot coerce 'one' to Integer"),
+    ('processes[2].env[{{port}}]',
+     "IntegerIntegerMap key {{port}} failed check: Unable to interpolate: "
+     "Cannot coerce 'http' to Integer"),
+    ('instances', "'{{count}}' not an integer"),
+  ]
+  assert not job.check().ok()
+  assert [ref.address() for ref, _ in job.check_all(max_errors=2)] == [
+    'processes[0].resources.ram', 'processes[1].name']
+
+  fixed = job(processes=[Process(name='a')], instances=3)
+  assert fixed.check().ok() and fixed.check_all() == []
+  assert [ref.is_empty() for ref, _ in Integer('{{x}}').check_all()] == [True]
+
+
+def test_check_cache(monkeypatch):
+  checked = []
+  checker = Integer.checker
+
+  def counted_checker(cls, obj):
+    checked.append(obj._value)
+    return checker(obj)
+  monkeypatch.setattr(Integer, 'checker', classmethod(counted_checker))
+
+  class Resources(Struct):
+    cpu = Integer
+    ram = Integer
+    disk = Integer
+
+  resources = Resources(cpu=1, ram='{{memory}}', disk=3).bind(memory=256)
+  assert resources.check().ok()
+  assert sorted(checked) == [1, 3, 256]
+
+  del checked[:]
+  assert resources.check().ok()
+  assert checked == []
+
+  bound = resources.bind(memory=512)
+  assert bound.check().ok()
+  assert checked == [512]
+
+  del checked[:]
+  assert bound(disk=4).check().ok()
+  assert sorted(checked) == [4, 512]
+
+
+def test_intern():
+  class Resources(Struct):
+    cpu = Float
+    ram = Integer
+
+  class Process(Struct):
+    name = String
+    cmdline = String
+    resources = Resources
+    ports = List(Integer)
+
+  table = InternTable()
+  processes = [Process(name='p%d' % (k % 3), cmdline='echo {{name}}',
+                       resources=Resources(cpu=1, ram='%d' % (k % 2)), ports=[80, 443])
+               for k in range(12)]
+  interned = [table.intern(process) for process in processes]
+  assert interned == processes
+  assert [p.json_dumps() for p in interned] == [p.json_dumps() for p in processes]
+  assert interned[0].check().ok()
+
+  # Equal literal subtrees are shared, templated ones are not.
+  assert interned[0].resources() is not interned[1].resources()
+  assert interned[0]._schema_data['resources'] is interned[2]._schema_data['resources']
+  assert interned[0]._schema_data['ports'] is interned[5]._schema_data['ports']
+  assert interned[0] is not interned[6]
+  assert Resources(cpu=1, ram=1).intern(table) is interned[1]._schema_data['resources']
+  assert Resources(cpu='{{cores}}').intern(table).cpu() == Float('{{cores}}')
+
+  # Two Resources, two rams and a cpu, two ports and their List, and three names.
+  assert len(table) == 2 + 2 + 1 + 2 + 1 + 3
+  assert Float(-0.0).intern(table) is not Float(0.0).intern(table)
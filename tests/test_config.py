@@ -2,13 +2,16 @@ import contextlib
 import json
 import os
 import shutil
+import stat
+import subprocess
+import sys
 import tempfile
 import textwrap
 from io import BytesIO
 
 import pytest
 
-from pystachio.config import Config, ConfigContext
+from pystachio.config import CodeCache, Config, ConfigContext, ConfigSnapshot
 
 
 @contextlib.contextmanager
@@ -106,3 +109,231 @@ def test_filelike_config():
   foo = b"include('derp')\na = 'Hello'"
   with pytest.raises(Config.InvalidConfigError):
     config = Config(BytesIO(foo))
+
+
+def test_code_cache():
+  layout = {
+    'a.config':
+      """
+      include("b.config")
+      a = b
+      """,
+
+    'b.config':
+      """
+      b = "Hello"
+      """,
+  }
+
+  with make_layout(layout) as td:
+    cache = CodeCache(os.path.join(td, 'cache'))
+    config = Config(os.path.join(td, 'a.config'), code_cache=cache)
+    assert config.environment['a'] == 'Hello'
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+    # warm loads are served from the cache.
+    compiled = []
+    original_compile = cache.compile
+    def tracking_compile(data, filename):
+      compiled.append(cache.load(filename, data) is not None)
+      return original_compile(data, filename)
+    cache.compile = tracking_compile
+    config = Config(os.path.join(td, 'a.config'), code_cache=cache)
+    assert config.environment['a'] == 'Hello'
+    assert compiled == [True, True]
+
+    # changing the source invalidates the entry.
+    with open(os.path.join(td, 'b.config'), 'w') as fp:
+      fp.write('b = "Goodbye"')
+    del compiled[:]
+    config = Config(os.path.join(td, 'a.config'), code_cache=cache)
+    assert config.environment['a'] == 'Goodbye'
+    assert compiled == [True, False]
+
+
+def test_code_cache_honors_umask():
+  with make_layout({'a.config': 'a = 1'}) as td:
+    cache = CodeCache(os.path.join(td, 'cache'))
+    umask = os.umask(0o022)
+    try:
+      Config(os.path.join(td, 'a.config'), code_cache=cache)
+    finally:
+      os.umask(umask)
+    entries = os.listdir(cache.cache_dir)
+    assert len(entries) == 1 and entries[0].endswith(CodeCache.SUFFIX)
+    assert stat.S_IMODE(os.stat(os.path.join(cache.cache_dir, entries[0])).st_mode) == 0o644
+
+
+def test_resource_config():
+  layout = {
+    'config_pkg/__init__.py': '',
+    'config_pkg/a.config':
+      """
+      include("b.config")
+      a = b
+      """,
+    'config_pkg/b.config':
+      """
+      b = "Hello"
+      """,
+  }
+
+  with make_layout(layout) as td:
+    sys.path.insert(0, td)
+    try:
+      config = Config('config_pkg/a.config')
+      assert config.environment['a'] == 'Hello'
+      assert config.loadables[ConfigContext.key('config_pkg/a.config', 'b.config')] == (
+          textwrap.dedent(layout['config_pkg/b.config']).encode('utf-8'))
+      with pytest.raises(Config.NotFound):
+        Config('config_pkg/missing.config')
+    finally:
+      sys.path.remove(td)
+      sys.modules.pop('config_pkg', None)
+
+
+def test_import_does_not_load_pkg_resources():
+  output = subprocess.check_output([sys.executable, '-c',
+      'import sys, pystachio.config; print("pkg_resources" in sys.modules)'])
+  assert output.strip() == b'False'
+
+
+def test_include_deduplication():
+  layout = {
+    'job.config':
+      """
+      include("left.config")
+      include("right.config")
+      """,
+    'left.config':
+      """
+      include("common.config")
+      left = counter
+      """,
+    'right.config':
+      """
+      include("./common.config")
+      right = counter
+      """,
+    'common.config':
+      """
+      counter = globals().get('counter', 0) + 1
+      """,
+  }
+
+  with make_layout(layout) as td:
+    with pushd(td):
+      config = Config('job.config')
+      assert config.environment['left'] == 1
+      assert config.environment['right'] == 1
+
+      graph = config.include_graph
+      assert graph[ConfigContext.ROOT].includes == ['job.config']
+      assert graph['job.config'].includes == ['left.config', 'right.config']
+      assert graph['left.config'].includes == ['common.config']
+      assert graph['right.config'].includes == ['common.config']
+      assert all(node.load_time >= 0 for path, node in graph.items() if path)
+
+      # loadables still record every include so the load can be replayed.
+      replayed = Config(config.loadables)
+      assert replayed.environment['right'] == 1
+      assert replayed.loadables == config.loadables
+
+      config = Config('job.config', dedupe_includes=False)
+      assert config.environment['left'] == 1
+      assert config.environment['right'] == 2
+
+
+def test_config_snapshot():
+  layout = {
+    'prelude.config':
+      """
+      class Resources(Struct):
+        cpu = Float
+      DEFAULTS = {'cpu': 1.0}
+      loaded = globals().get('loaded', 0) + 1
+      """,
+    'job.config':
+      """
+      include("prelude.config")
+      DEFAULTS['cpu'] = 2.0
+      Resources = None
+      job = loaded
+      """,
+  }
+
+  with make_layout(layout) as td:
+    with pushd(td):
+      base = Config('prelude.config').snapshot()
+      assert base.executed == frozenset(['prelude.config'])
+
+      for _ in range(2):
+        config = Config('job.config', base=base)
+        assert config.environment['job'] == 1
+        assert config.environment['DEFAULTS'] == {'cpu': 2.0}
+        assert config.environment['Resources'] is None
+        assert config.include_graph['job.config'].includes == ['prelude.config']
+        assert 'prelude.config' not in config.include_graph
+
+      # the snapshot itself is unaffected by configs loaded on top of it.
+      environment = base.clone()
+      assert environment['DEFAULTS'] == {'cpu': 1.0}
+      assert environment['Resources'](cpu=1).check().ok()
+
+      config = Config('job.config', base=base, dedupe_includes=False)
+      assert config.environment['job'] == 2
+
+  schema_base = ConfigSnapshot.from_schema()
+  config = Config(BytesIO(b"a = String('hello')"), base=schema_base)
+  assert config.environment['a'].get() == 'hello'
+
+
+def test_config_snapshot_functions():
+  layout = {
+    'prelude.config':
+      """
+      JOBS = []
+      def register(job):
+        JOBS.append(job)
+        return len(JOBS)
+      class Base(object):
+        def describe(self):
+          return 'base'
+      class Registry(Base):
+        @classmethod
+        def count(cls):
+          return len(JOBS)
+        def describe(self):
+          return super().describe() + ':' + str(len(JOBS))
+      class Child(Registry):
+        pass
+      DEFAULT = Child()
+      """,
+    'job.config':
+      """
+      include("prelude.config")
+      n = register('x')
+      described = Registry().describe()
+      count = Registry.count()
+      related = (isinstance(DEFAULT, Base), isinstance(DEFAULT, Registry), issubclass(Child, Base))
+      """,
+  }
+
+  with make_layout(layout) as td:
+    with pushd(td):
+      plain = Config('job.config')
+      base = Config('prelude.config').snapshot()
+      for _ in range(3):
+        config = Config('job.config', base=base)
+        for environment in (plain.environment, config.environment):
+          assert environment['n'] == 1
+          assert environment['JOBS'] == ['x']
+          assert environment['described'] == 'base:1'
+          assert environment['count'] == 1
+          assert environment['related'] == (True, True, True)
+      clone = base.clone()
+      assert clone['JOBS'] == []
+      assert isinstance(clone['DEFAULT'], clone['Base'])
+      assert issubclass(clone['Child'], clone['Registry'])
+      assert clone['DEFAULT'].describe() == 'base:0'
+      assert clone['Base'] is not base.clone()['Base']
@@ -1,3 +1,5 @@
+import io
+import json
 import os
 import tempfile
 
@@ -238,3 +240,72 @@ def test_load_json_fp():
         assert p == Process.json_load(fp)
     finally:
       os.unlink(fn)
+
+
+def test_json_loads_decoder():
+  Color = Enum('Color', ('red', 'green'))
+
+  class Port(Struct):
+    name = String
+    number = Integer
+
+  class Job(Struct):
+    name = Default(String, 'job')
+    color = Color
+    ports = List(Port)
+    env = Map(String, Integer)
+    weight = Float
+
+  js = ('{"name": "web", "color": "red", "weight": 0.5, "env": {"a": 1, "b": "{{b}}"},'
+        ' "ports": [{"name": "http", "number": 80, "extra": 1}, {"number": "{{p}}"}]}')
+  job = Job.json_loads(js)
+  assert job == Job(name='web', color='red', weight=0.5, env={'a': 1, 'b': '{{b}}'},
+                    ports=[Port(name='http', number=80), Port(number='{{p}}')])
+  assert job.bind(b=2, p=443).check().ok()
+  assert Job.json_loads(js, trusted=True) == job
+  assert Job.json_loads(job.bind(b=2, p=443).json_dumps(), trusted=True) == job.bind(b=2, p=443)
+
+  with pytest.raises(AttributeError):
+    Job.json_loads(js, strict=True)
+  with pytest.raises(ValueError):
+    Job.json_loads('{"color": "blue"}')
+  with pytest.raises(ValueError):
+    Job.json_loads('{"ports": 1}')
+  with pytest.raises(ValueError):
+    Job.json_loads('{"ports": [1]}')
+
+
+def test_jsonl():
+  from pystachio.jsonl import RecordError
+
+  class Record(Struct):
+    name = String
+    count = Integer
+
+  records = [Record(name='r%d' % k, count=k) for k in range(1000)]
+  fp = io.StringIO()
+  assert Record.dump_jsonl(records + [{'count': '{{x}}'}], fp) == 1001
+  lines = fp.getvalue().splitlines()
+  assert len(lines) == 1001
+  assert json.loads(lines[-1]) == {'count': '{{x}}'}
+
+  fp.seek(0)
+  assert list(Record.iter_jsonl(fp)) == records + [Record(count='{{x}}')]
+  fp.seek(0)
+  assert list(Record.iter_jsonl(fp, processes=2, chunksize=64)) == records + [Record(count='{{x}}')]
+
+  fp.seek(0)
+  with pytest.raises(RecordError) as e:
+    list(Record.iter_jsonl(fp, check=True))
+  assert e.value.lineno == 1001
+  fp.seek(0)
+  with pytest.raises(RecordError) as e:
+    list(Record.iter_jsonl(fp, check=True, processes=2, chunksize=64))
+  assert e.value.lineno == 1001
+
+  with pytest.raises(RecordError):
+    list(Record.iter_jsonl(io.StringIO('{"name": "a"}\n\n{"name": \n')))
+  for line in ('{"name": "a", "unknown": 1}', '["a"]', '7'):
+    with pytest.raises(RecordError) as e:
+      list(Record.iter_jsonl(io.StringIO('{"name": "a"}\n' + line + '\n'), strict=True))
+    assert e.value.lineno == 2
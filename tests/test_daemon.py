@@ -0,0 +1,83 @@
+import json
+import os
+import socket
+import threading
+
+import pytest
+from test_config import make_layout
+
+from pystachio.config import Config
+from pystachio.daemon import ConfigClient, ConfigServer
+
+LAYOUT = {
+  'prelude.config':
+    """
+    class Process(Struct):
+      name = Required(String)
+      cmdline = String
+    """,
+  'job.config':
+    """
+    include("prelude.config")
+    process = Process(name = 'hello', cmdline = 'echo {{greeting}}')
+    """,
+}
+
+
+@pytest.fixture
+def daemon(tmp_path):
+  with make_layout(LAYOUT) as td:
+    socket_path = str(tmp_path / 'pystachio.sock')
+    base = Config(os.path.join(td, 'prelude.config')).snapshot()
+    server = ConfigServer(socket_path, base=base)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05})
+    thread.daemon = True
+    thread.start()
+    try:
+      yield td, socket_path
+    finally:
+      server.shutdown()
+      server.server_close()
+      os.unlink(socket_path)
+
+
+def test_render(daemon):
+  td, socket_path = daemon
+  client = ConfigClient(socket_path)
+  result = client.render(os.path.join(td, 'job.config'), 'process', {'greeting': 'world'})
+  assert json.loads(result) == {'name': 'hello', 'cmdline': 'echo world'}
+
+  # configs evaluated by the daemon cannot affect each other.
+  config = Config(os.path.join(td, 'job.config'))
+  assert json.loads(client.render(config.loadables, 'process', {'greeting': 'again'})) == {
+      'name': 'hello', 'cmdline': 'echo again'}
+
+  with pytest.raises(ConfigClient.Error):
+    client.render(os.path.join(td, 'job.config'), 'missing')
+
+  stats = client.stats()
+  assert stats['requests'] == 3
+  assert stats['errors'] == 1
+  assert stats['max_ms'] >= stats['p50_ms'] > 0
+
+  # stats are answered by the daemon, so answering them loses no samples.
+  assert client.stats()['requests'] == 4
+  assert client.stats()['requests'] == 5
+
+
+def test_idle_client_does_not_block_daemon(daemon):
+  td, socket_path = daemon
+  idle = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  idle.connect(socket_path)
+  try:
+    results = []
+    thread = threading.Thread(target=lambda: results.append(
+        ConfigClient(socket_path).render(os.path.join(td, 'job.config'), 'process')))
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout=10)
+    assert results == [json.dumps({'name': 'hello', 'cmdline': 'echo {{greeting}}'})]
+  finally:
+    # Forked children share the socket, so close() alone would not hang it up.
+    idle.shutdown(socket.SHUT_RDWR)
+    idle.close()
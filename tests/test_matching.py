@@ -1,5 +1,5 @@
 from pystachio import *
-from pystachio.matcher import Any, Matcher
+from pystachio.matcher import Any, Matcher, MatcherSet
 
 
 def test_matcher():
@@ -44,3 +44,81 @@ def test_binder():
 
   assert str(packer_matcher.apply(packer_binder, String('{{packer[foo][bar][baz].target}}'))) == (
       'foo/bar/baz')
+
+
+def test_matcher_set():
+  packer = Matcher('packer')[Any][Any][Any]
+  derp = Matcher('derp').Any[r'\d+']
+  herp = Matcher('herp')
+  herp_derp = Matcher('herp').derp
+  matchers = MatcherSet([packer, derp, herp, herp_derp, Matcher('nope')])
+  assert len(matchers) == 5
+
+  obj = String('{{packer[foo][bar][baz].bak}} {{derp.a[23]}} {{herp.derp}} {{derp.a.b}}')
+  hits = sorted(matchers.match(obj), key=lambda hit: hit[1])
+  assert hits == sorted([
+    (packer, ('packer', 'foo', 'bar', 'baz')),
+    (derp, ('derp', 'a', '23')),
+    (herp, ('herp',)),
+    (herp_derp, ('herp', 'derp')),
+  ], key=lambda hit: hit[1])
+
+  for matcher in matchers:
+    assert [args for m, args in matchers.match(obj) if m is matcher] == (
+        list(matcher.match(obj)))
+
+  assert list(MatcherSet().match(obj)) == []
+
+
+def test_binder_binds_once():
+  class Packer(Struct):
+    target = Required(String)
+
+  packer_matcher = Matcher('packer')[Any][Any][Any]
+  calls = []
+
+  def packer_binder(_, role, env, name):
+    calls.append((role, env, name))
+    return Packer(target = '{{role}}/{{env}}/{{name}}').bind(role=role, env=env, name=name)
+
+  template = List(String)([
+    '{{packer[%s][prod][web].target}}' % role for role in ('a', 'b', 'c')] +
+    ['{{packer[a][prod][web].target}}', '{{unmatched}}'])
+  bound = packer_matcher.apply(packer_binder, template)
+  assert len(bound.scopes()) == 1
+  assert len(calls) == 3
+  interpolated, unbound = bound.interpolate()
+  assert interpolated == List(String)(
+      ['a/prod/web', 'b/prod/web', 'c/prod/web', 'a/prod/web', '{{unmatched}}'])
+  assert unbound == [Ref.from_address('unmatched')]
+
+  unmatched = String('{{unmatched}}')
+  assert packer_matcher.apply(packer_binder, unmatched) is unmatched
+
+  del calls[:]
+  objects = [String('{{packer[a][prod][web].target}}'),
+             String('{{packer[b][prod][web].target}}'),
+             String('{{packer[a][prod][web].target}}')]
+  applied = packer_matcher.apply_all(packer_binder, objects)
+  assert [str(obj) for obj in applied] == ['a/prod/web', 'b/prod/web', 'a/prod/web']
+  assert len(calls) == 2
+  assert applied[0].scopes()[0] is applied[2].scopes()[0]
+
+
+def test_matchers_share_free_refs(monkeypatch):
+  walks = []
+  iter_free_refs = String._iter_free_refs
+
+  def counting_iter_free_refs(self, scopes):
+    walks.append(self)
+    return iter_free_refs(self, scopes)
+
+  monkeypatch.setattr(String, '_iter_free_refs', counting_iter_free_refs)
+  obj = String('{{packer[a][prod][web].target}} {{herp.derp}}')
+  packer, herp = Matcher('packer')[Any][Any][Any], Matcher('herp').derp
+  assert list(packer.match(obj)) == [('packer', 'a', 'prod', 'web')]
+  assert list(herp.match(obj)) == [('herp', 'derp')]
+  assert len(list(MatcherSet([packer, herp]).match(obj))) == 2
+  applied = herp.apply_all(lambda herp, derp: 'x', [obj, obj])
+  assert applied[0].scopes()[0] is applied[1].scopes()[0]
+  assert walks == [obj]
@@ -0,0 +1,90 @@
+from pystachio import *
+from pystachio.reactive import Reactive
+
+
+class Resources(Struct):
+  cpu = Float
+  ram = Integer
+
+
+class Process(Struct):
+  name = String
+  cmdline = String
+  resources = Resources
+  ports = Map(String, Integer)
+
+
+class Job(Struct):
+  name = String
+  processes = List(Process)
+  version = String
+
+
+JOB = Job(
+  name = '{{profile.name}}',
+  version = '{{profile.version}}',
+  processes = [
+    Process(name = 'web', cmdline = 'run --version={{profile.version}}',
+            resources = Resources(cpu = '{{profile.cpu}}', ram = 1024),
+            ports = {'http': '{{profile.port}}'}),
+    Process(name = 'worker', cmdline = 'work {{self.name}}',
+            resources = Resources(cpu = 1.0, ram = 2048)),
+  ],
+)
+
+
+def test_reactive_matches_interpolate():
+  preview = Reactive(JOB)
+  for binding in [
+      {'profile': {'name': 'job', 'version': 1, 'cpu': 1.0, 'port': 80}},
+      {'profile': {'name': 'job', 'version': 2, 'cpu': 1.0, 'port': 80}},
+      {'profile': {'name': 'job', 'version': '{{release}}', 'cpu': 1.0, 'port': 80}},
+      {'profile': {'name': 'job', 'version': '{{release}}', 'cpu': 1.0, 'port': 80},
+       'release': 'r3'},
+      {'profile': {'name': 'other', 'cpu': 2.0}},
+      {}]:
+    interpolated, unbound = preview.interpolate(binding)
+    expected, expected_unbound = JOB.bind(binding).interpolate()
+    assert interpolated == expected
+    assert interpolated.json_dumps() == expected.json_dumps()
+    assert set(unbound) == set(expected_unbound)
+
+
+def test_reactive_reuses_unchanged_subtrees():
+  preview = Reactive(JOB)
+  profile = {'name': 'job', 'version': 1, 'cpu': 1.0, 'port': 80}
+  first, _ = preview.interpolate(profile = profile)
+  second, _ = preview.interpolate(profile = dict(profile, version = 2))
+
+  assert second.version().get() == '2'
+  assert second.processes()[0].cmdline().get() == 'run --version=2'
+
+  # untouched subtrees are shared with the previous result.
+  def field(obj, *path):
+    for key in path:
+      obj = obj._values[key] if isinstance(key, int) else obj._schema_data[key]
+    return obj
+  assert field(second, 'name') is field(first, 'name')
+  assert field(second, 'processes', 1) is field(first, 'processes', 1)
+  assert field(second, 'processes', 0, 'resources') is field(first, 'processes', 0, 'resources')
+  assert field(second, 'processes', 0, 'ports') is field(first, 'processes', 0, 'ports')
+  assert field(second, 'version') is not field(first, 'version')
+
+  third, _ = preview.interpolate(profile = dict(profile, version = 2))
+  assert third is second
+
+
+def test_reactive_leaf():
+  preview = Reactive(String('{{a}}-{{b}}'))
+  assert preview.interpolate(a = 1) == (String('1-{{b}}'), [Ref.from_address('b')])
+  assert preview.interpolate(a = 1, b = 2) == (String('1-2'), [])
+
+
+def test_reactive_bound_objects():
+  class Profile(Struct):
+    version = String
+
+  preview = Reactive(String('v={{profile.version}}'))
+  profile = Profile(version = '{{release}}')
+  assert preview.interpolate(profile = profile, release = '1') == (String('v=1'), [])
+  assert preview.interpolate(profile = profile, release = '2') == (String('v=2'), [])
@@ -0,0 +1,207 @@
+import os
+import textwrap
+
+from test_config import make_layout
+
+from pystachio.reloader import ConfigReloader
+
+
+def rewrite(filename, content):
+  # Ensure the stat changes even on filesystems with coarse timestamps.
+  st = os.stat(filename)
+  with open(filename, 'w') as fp:
+    fp.write(textwrap.dedent(content))
+  os.utime(filename, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+LAYOUT = {
+  'job.config':
+    """
+    include("left.config")
+    include("right.config")
+    job = left + right
+    """,
+  'left.config':
+    """
+    include("common.config")
+    left = common + 1
+    """,
+  'right.config':
+    """
+    include("common.config")
+    right = common + 2
+    """,
+  'common.config':
+    """
+    executions = globals().get('executions', 0) + 1
+    common = 10
+    """,
+}
+
+
+def test_incremental_reload():
+  with make_layout(LAYOUT) as td:
+    reloader = ConfigReloader(os.path.join(td, 'job.config'))
+    assert reloader.environment['job'] == 23
+    assert reloader.poll() == set()
+
+    rewrite(os.path.join(td, 'right.config'), """
+      include("common.config")
+      right = common + 100
+      extra = 'hello'
+      """)
+    right, job = os.path.join(td, 'right.config'), os.path.join(td, 'job.config')
+    assert reloader.changed_files() == set([right])
+    assert reloader.poll() == set(['right', 'job', 'extra'])
+    assert reloader.environment['job'] == 121
+    # left.config and common.config were carried over rather than executed again.
+    assert reloader.environment['executions'] == 1
+    assert set(path for path, node in reloader.config.include_graph.items() if path) == (
+        set([right, job]))
+
+    rewrite(os.path.join(td, 'right.config'), """
+      include("common.config")
+      right = common + 100
+      """)
+    assert reloader.poll() == set(['extra'])
+    assert 'extra' not in reloader.environment
+
+    rewrite(os.path.join(td, 'common.config'), """
+      executions = globals().get('executions', 0) + 1
+      common = 20
+      """)
+    assert reloader.poll() == set(['common', 'left', 'right', 'job'])
+    assert reloader.environment['job'] == 141
+
+
+def test_reload_falls_back_to_full_load():
+  layout = dict(LAYOUT)
+  layout['job.config'] = """
+    include("left.config")
+    include("right.config")
+    common = 0
+    job = left + right
+    """
+  with make_layout(layout) as td:
+    reloader = ConfigReloader(os.path.join(td, 'job.config'))
+    assert reloader.environment['common'] == 0
+
+    # job.config rebinds a name common.config defines, so removing the rebinding
+    # must restore common.config's value.
+    rewrite(os.path.join(td, 'job.config'), LAYOUT['job.config'])
+    assert reloader.poll() == set(['common'])
+    assert reloader.environment['common'] == 10
+    assert reloader.environment['executions'] == 1
+
+
+def test_reload_rebinds_carried_over_functions():
+  layout = {
+    'job.config':
+      """
+      include("common.config")
+      GREETING = 'hi'
+      x = greet()
+      """,
+    'common.config':
+      """
+      executions = globals().get('executions', 0) + 1
+      def greet():
+        return GREETING
+      """,
+  }
+  with make_layout(layout) as td:
+    reloader = ConfigReloader(os.path.join(td, 'job.config'))
+    assert reloader.environment['x'] == 'hi'
+
+    rewrite(os.path.join(td, 'job.config'), """
+      include("common.config")
+      GREETING = 'bye'
+      x = greet()
+      """)
+    assert reloader.poll() == set(['GREETING', 'x'])
+    assert reloader.environment['x'] == 'bye'
+    assert reloader.environment['executions'] == 1
+
+
+def test_reload_does_not_carry_over_containers():
+  layout = {
+    'job.config':
+      """
+      include("common.config")
+      register('a')
+      """,
+    'common.config':
+      """
+      JOBS = []
+      def register(job):
+        JOBS.append(job)
+      """,
+  }
+  with make_layout(layout) as td:
+    reloader = ConfigReloader(os.path.join(td, 'job.config'))
+    assert reloader.environment['JOBS'] == ['a']
+
+    # JOBS was mutated by job.config, so common.config must be executed again.
+    rewrite(os.path.join(td, 'job.config'), """
+      include("common.config")
+      register('b')
+      """)
+    assert reloader.poll() == set(['JOBS'])
+    assert reloader.environment['JOBS'] == ['b']
+
+
+def test_reload_reexecutes_files_reading_changed_names():
+  layout = {
+    'job.config':
+      """
+      include("b.config")
+      include("c.config")
+      """,
+    'b.config':
+      """
+      version = 1
+      """,
+    'c.config':
+      """
+      derived = version * 10
+      """,
+  }
+  with make_layout(layout) as td:
+    reloader = ConfigReloader(os.path.join(td, 'job.config'))
+    assert reloader.environment['derived'] == 10
+
+    # c.config ran after b.config bound version, so it may have read it.
+    rewrite(os.path.join(td, 'b.config'), """
+      version = 2
+      """)
+    assert reloader.poll() == set(['version', 'derived'])
+    assert reloader.environment['derived'] == 20
+
+
+def test_reload_keeps_carried_over_classes():
+  layout = {
+    'job.config':
+      """
+      include("common.config")
+      GREETING = 'hi'
+      x = Greeter().greet()
+      """,
+    'common.config':
+      """
+      class Base(object):
+        def greet(self):
+          return GREETING
+      class Greeter(Base):
+        pass
+      """,
+  }
+  with make_layout(layout) as td:
+    reloader = ConfigReloader(os.path.join(td, 'job.config'))
+    rewrite(os.path.join(td, 'job.config'), """
+      include("common.config")
+      GREETING = 'bye'
+      x = Greeter().greet()
+      """)
+    assert reloader.poll() == set(['GREETING', 'x'])
+    assert reloader.environment['x'] == 'bye'
+    assert issubclass(reloader.environment['Greeter'], reloader.environment['Base'])
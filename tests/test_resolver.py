@@ -0,0 +1,69 @@
+from pystachio import *
+from pystachio.resolver import CachingResolver, Resolver
+
+
+class DictResolver(Resolver):
+  def __init__(self, values):
+    self.values = values
+    self.requests = []
+
+  def resolve(self, refs):
+    self.requests.append(sorted(ref.address() for ref in refs))
+    return dict((ref, self.values[ref.address()]) for ref in refs
+                if ref.address() in self.values)
+
+
+class Process(Struct):
+  name = String
+  cmdline = String
+  env = Map(String, String)
+
+
+def test_resolver_binds_in_one_batch():
+  resolver = DictResolver({
+    'package.version': '1.2',
+    'secrets.db': 'hunter2',
+    'secrets.api': 'swordfish',
+  })
+  process = Process(
+    name = 'web-{{package.version}}',
+    cmdline = 'run --db={{secrets.db}} --api={{secrets.api}} --user={{user}}',
+    env = {'VERSION': '{{package.version}}'})
+  bound = resolver.bind(process)
+  assert resolver.requests == [['package.version', 'secrets.api', 'secrets.db', 'user']]
+  interpolated, unbound = bound.interpolate()
+  assert interpolated == Process(
+    name = 'web-1.2',
+    cmdline = 'run --db=hunter2 --api=swordfish --user={{user}}',
+    env = {'VERSION': '1.2'})
+  assert unbound == [Ref.from_address('user')]
+
+  literal = Process(name = 'literal')
+  assert resolver.bind(literal) is literal
+  assert len(resolver.requests) == 1
+
+
+def test_resolver_follows_templated_values():
+  resolver = DictResolver({'a': '{{b}}', 'b': '{{c}}', 'c': 'done'})
+  assert str(resolver.bind(String('{{a}}'))) == 'done'
+  assert resolver.requests == [['a'], ['b'], ['c']]
+
+
+def test_caching_resolver():
+  now = [0]
+  backing = DictResolver({'a': 1, 'b': 2})
+  resolver = CachingResolver(backing, ttl = 10, clock = lambda: now[0])
+
+  assert str(resolver.bind(String('{{a}} {{b}} {{c}}'))) == '1 2 {{c}}'
+  assert str(resolver.bind(String('{{a}} {{b}} {{c}}'))) == '1 2 {{c}}'
+  assert backing.requests == [['a', 'b', 'c']]
+
+  now[0] = 5
+  assert resolver.resolve([Ref.from_address('a'), Ref.from_address('d')]) == {
+      Ref.from_address('a'): 1}
+  assert backing.requests == [['a', 'b', 'c'], ['d']]
+
+  now[0] = 10
+  backing.values['c'] = 3
+  assert str(resolver.bind(String('{{a}} {{b}} {{c}}'))) == '1 2 3'
+  assert backing.requests[-1] == ['a', 'b', 'c']
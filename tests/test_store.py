@@ -0,0 +1,83 @@
+import os
+import stat
+
+import pytest
+
+from pystachio import binary
+from pystachio.basic import Float, Integer, String
+from pystachio.composite import Default, Empty, Struct
+from pystachio.container import List, Map
+from pystachio.store import ConfigStore
+
+
+class Resources(Struct):
+  cpu = Float
+  ram = Integer
+
+
+class Job(Struct):
+  name = String
+  instances = Default(Integer, 1)
+  resources = Resources
+  args = List(String)
+  env = Map(String, String)
+
+
+def test_store(tmpdir):
+  filename = str(tmpdir.join('jobs.store'))
+  jobs = dict(('job%d' % k, Job(name='{{prefix}}%d' % k, resources=Resources(cpu=k / 2.0),
+                                args=['--id=%d' % k]).bind(prefix='job'))
+              for k in range(100))
+  jobs[u'caf\xe9'] = Job(env={'a': 'b'})
+  assert ConfigStore.write(filename, Job, jobs) == 101
+
+  with ConfigStore(filename, Job) as store:
+    assert len(store) == 101
+    assert sorted(store) == sorted(jobs)
+    assert 'job7' in store and 'job700' not in store
+    assert store.get('job700') is None
+    with pytest.raises(KeyError):
+      store['job700']
+
+    record = store['job7']
+    assert record.name() == String('job7')
+    assert record.instances() == Integer(1)
+    assert record.resources() == Resources(cpu=3.5)
+    assert record.has_args() and not record.has_env()
+    assert record.env() is Empty
+    with pytest.raises(AttributeError):
+      record.nonexistent
+    for key, job in jobs.items():
+      assert store[key].struct() == job
+      assert store[key].struct().json_dumps() == job.json_dumps()
+
+  with pytest.raises(binary.SchemaMismatch):
+    ConfigStore(filename, Resources)
+  ConfigStore.write(filename, Job, {})
+  assert len(ConfigStore(filename, Job)) == 0
+
+
+def test_store_rejects_empty_and_truncated_files(tmpdir):
+  filename = str(tmpdir.join('jobs.store'))
+  open(filename, 'wb').close()
+  with pytest.raises(ConfigStore.Error):
+    ConfigStore(filename, Job)
+
+  ConfigStore.write(filename, Job, {'job': Job(name='job')})
+  with open(filename, 'rb') as fp:
+    data = fp.read()
+  with open(filename, 'wb') as fp:
+    fp.write(data[:-1])
+  with pytest.raises(ConfigStore.Error):
+    ConfigStore(filename, Job)
+
+
+def test_store_honors_umask(tmpdir):
+  filename = str(tmpdir.join('jobs.store'))
+  umask = os.umask(0o022)
+  try:
+    ConfigStore.write(filename, Job, {'job': Job(name='job')})
+  finally:
+    os.umask(umask)
+  assert stat.S_IMODE(os.stat(filename).st_mode) == 0o644
+  assert os.listdir(str(tmpdir)) == ['jobs.store']
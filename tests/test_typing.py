@@ -1,3 +1,7 @@
+import subprocess
+import sys
+import textwrap
+
 import pytest
 
 from pystachio import *
@@ -154,3 +158,30 @@ def test_unimplementeds():
     Type().check()
   with pytest.raises(NotImplementedError):
     Type.serialize_type()
+
+
+def test_lazy_package_imports():
+  import pystachio
+  assert set(pystachio.__all__) <= set(dir(pystachio))
+  with pytest.raises(AttributeError):
+    pystachio.DoesNotExist
+
+  # Submodules are reachable as attributes of the package, as they were when the
+  # package imported them eagerly.
+  script = textwrap.dedent('''
+    import pystachio
+    print(pystachio.composite.Struct is pystachio.Struct,
+          pystachio.naming.frozendict.__name__)
+  ''')
+  assert subprocess.check_output([sys.executable, '-c', script]).split() == [b'True', b'frozendict']
+
+  # Only the modules backing the accessed names should be imported, and the
+  # builtin type factories must still be available to TypeFactory.
+  script = textwrap.dedent('''
+    import sys
+    from pystachio import TypeFactory
+    assert 'pystachio.composite' not in sys.modules
+    deposit = TypeFactory.load_json(['Struct', 'Employee', [['name', [True, [], True, ['String']]]]])
+    print(deposit['Employee'](name='Bob').check().ok())
+  ''')
+  assert subprocess.check_output([sys.executable, '-c', script]).strip() == b'True'